@@ -1,7 +1,7 @@
 mkdir -p release
 
-nuitka --standalone --onefile --follow-imports src/server.py -o server_linux &
-nuitka --standalone --onefile --follow-imports src/client.py -o client_linux &
+nuitka --standalone --onefile --follow-imports --lto=yes src/server.py -o server_linux &
+nuitka --standalone --onefile --follow-imports --lto=yes src/client.py -o client_linux &
 
 wait
 
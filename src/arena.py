@@ -204,7 +204,7 @@ class Arena:
                     current = came_from[current]
 
                 path.append(start)  # Ensure start is included
-                path = path[::-1]  # Reverse the path to start -> goal
+                path.reverse()  # In place to start -> goal, no second list
 
                 return path
 
@@ -250,19 +250,27 @@ class Arena:
         target_types: List[TargetType],
     ) -> Optional[UnitTarget]:
         """Determines the closest valid target based on owner and target types, prioritizing enemy units."""
-        enemy_units: List[IDUnit] = [
-            unit
-            for unit in self.units
-            if unit.inner.owner != target_owner
-            and unit.inner.underlying.layer in target_types
-            and unit.inner.unit_data.hitpoints > 0
-        ]
-        if enemy_units:
-            closest_enemy = min(
-                enemy_units,
-                key=lambda unit: abs(current_pos[0] - unit.inner.unit_data.x)
-                + abs(current_pos[1] - unit.inner.unit_data.y),
-            )
+        # One pass picks the closest live enemy. Enum members are singletons, so
+        # owners compare by identity; target_types stays a list because list
+        # membership tries identity first, while hashing an Enum runs Python code.
+        closest_enemy: Optional[IDUnit] = None
+        closest_dist = 0
+        cx, cy = current_pos
+        for unit in self.units:
+            inner = unit.inner
+            if (
+                inner.owner is target_owner
+                or inner.underlying.layer not in target_types
+            ):
+                continue
+            data = inner.unit_data
+            if data.hitpoints <= 0:
+                continue
+            d = abs(cx - data.x) + abs(cy - data.y)
+            if closest_enemy is None or d < closest_dist:
+                closest_enemy = unit
+                closest_dist = d
+        if closest_enemy is not None:
             # path = self.find_path(
             #     current_pos,
             #     (closest_enemy.inner.unit_data.x, closest_enemy.inner.unit_data.y),
@@ -388,61 +396,37 @@ class Arena:
     def tick(self, units: List[IDUnit]) -> List[IDUnit]:
         """Processes unit actions in the arena."""
         u = units.copy()
+        by_id = {unit.id: unit for unit in u}
 
         for unit in u:
-            if unit.inner.unit_data.current_target and unit.inner.underlying.range:
+            card = unit.inner.underlying
+            data = unit.inner.unit_data
+            target = data.current_target
+            if not target or not card.range or len(target.path) - 1 >= card.range:
+                continue
+
+            if target.unit_type == UnitTargetType.TROOP:
+                _unit = by_id.get(target.uuid)
                 if (
-                    len(unit.inner.unit_data.current_target.path) - 1
-                    < unit.inner.underlying.range
+                    _unit is not None
+                    and card.damage
+                    and card.attack_speed
+                    and _unit.inner.unit_data.hitpoints > 0
                 ):
-                    if (
-                        unit.inner.unit_data.current_target.unit_type
-                        == UnitTargetType.TROOP
-                    ):
-                        for _unit in u:
-                            if (
-                                _unit.id == unit.inner.unit_data.current_target.uuid
-                                and unit.inner.underlying.damage
-                                and unit.inner.underlying.attack_speed
-                                and _unit.inner.unit_data.hitpoints > 0
-                            ):
-                                if is_time_elapsed(
-                                    unit.inner.unit_data.last_attack,
-                                    unit.inner.underlying.attack_speed,
-                                ):
-                                    unit.inner.unit_data.last_attack = (
-                                        datetime.now().strftime(DATE_FORMAT)
-                                    )
-                                    _unit.inner.unit_data.hitpoints = (
-                                        _unit.inner.unit_data.hitpoints
-                                        - unit.inner.underlying.damage
-                                    )
-                    elif (
-                        unit.inner.unit_data.current_target.unit_type
-                        == UnitTargetType.BUILDING
-                    ):
-                        pass
-                    else:
-                        target_tower = self.tower_id_to_target(
-                            unit.inner.unit_data.current_target.uuid
+                    if is_time_elapsed(data.last_attack, card.attack_speed):
+                        data.last_attack = datetime.now().strftime(DATE_FORMAT)
+                        _unit.inner.unit_data.hitpoints = (
+                            _unit.inner.unit_data.hitpoints - card.damage
                         )
-
-                        if (
-                            self.towers[target_tower].current_hp > 0
-                            and unit.inner.underlying.damage
-                            and unit.inner.underlying.attack_speed
-                        ):
-                            if is_time_elapsed(
-                                unit.inner.unit_data.last_attack,
-                                unit.inner.underlying.attack_speed,
-                            ):
-                                unit.inner.unit_data.last_attack = (
-                                    datetime.now().strftime(DATE_FORMAT)
-                                )
-                                self.towers[target_tower].current_hp = (
-                                    self.towers[target_tower].current_hp
-                                    - unit.inner.underlying.damage
-                                )
+            elif target.unit_type == UnitTargetType.BUILDING:
+                pass
+            else:
+                tower = self.towers[self.tower_id_to_target(target.uuid)]
+
+                if tower.current_hp > 0 and card.damage and card.attack_speed:
+                    if is_time_elapsed(data.last_attack, card.attack_speed):
+                        data.last_attack = datetime.now().strftime(DATE_FORMAT)
+                        tower.current_hp = tower.current_hp - card.damage
 
         # self.towers = [tower for tower in self.towers if tower.current_hp > 0]
         # self._set_tower_tiles()
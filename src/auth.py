@@ -67,4 +67,16 @@ class UserMap:
 
 @dataclass
 class DataRequest:
+    """
+    Sent by every client on every tick, so it skips JSON: the payload is just
+    the UTF-8 encoded uuid.
+    """
+
     uuid: str
+
+    def to_bytes(self) -> bytes:
+        return self.uuid.encode()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "DataRequest":
+        return cls(data.decode())
@@ -30,8 +30,7 @@ def card_tick(_card: IDUnit, arena: Arena) -> Optional[IDUnit]:
     ):
         if (
             card.inner.underlying.range
-            and not len(card.inner.unit_data.current_target.path) - 1
-            < card.inner.underlying.range
+            and not len(path) - 1 < card.inner.underlying.range
         ):
             card.inner.unit_data.x, card.inner.unit_data.y = path[1]
             card.inner.unit_data.last_move = datetime.now().strftime(DATE_FORMAT)
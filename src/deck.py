@@ -1,9 +1,9 @@
 from dataclasses import dataclass
-from typing import List
+from typing import Tuple
 
 from card import Card
 
 
 @dataclass
 class Deck:
-    cards: List[Card]
+    cards: Tuple[Card, ...]
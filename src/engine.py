@@ -96,8 +96,10 @@ class InternalEngine:
         ] = {}
 
     def event_loop(self) -> None:
+        # Receivers only read the event type, so one instance serves every tick.
+        update_event = Event(EventType.UPDATE_STATE)
         while True:
-            self.event_pipeline.send(Event(EventType.UPDATE_STATE))
+            self.event_pipeline.send(update_event)
             time.sleep(0.1)
 
     def run_with_delay(self, delay: float, call: Callable[[], None]) -> None:
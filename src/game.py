@@ -22,10 +22,10 @@ from network import (
     Client,
     NetworkObject,
     Packet,
+    PacketRouter,
     Server,
     ServerStatus,
     deserialize_object,
-    do_if,
     serialize_object,
 )
 from inspect import getsourcefile
@@ -65,7 +65,7 @@ from engine import (
 from pipeline import Event, FramePipeline, StateData
 from engine import Engine
 from unit import Owner
-from util import json_to_dataclass, logger
+from util import logger
 
 
 @dataclass
@@ -141,6 +141,19 @@ class BattleClient:
 
 class GameNetworkClient(Client):
     def __init__(self, name: str, ip: Optional[str], on_finish: Optional[Callable[[], None]]):
+        # Built before connecting so the listen thread can dispatch straight away.
+        self.router = (
+            PacketRouter()
+            .on(PacketType.CONNECTION, lambda _: self.update_connection_status(True))
+            .on(PacketType.STATUS, lambda p: self.update_status(p.data))
+            .on(PacketType.DISCONNECT, lambda _: self.update_connection_status(False))
+            .on(PacketType.LOGIN_SUCCESS, self.login_success)
+            .on(PacketType.LOGIN_FAIL, self.login_fail)
+            .on(PacketType.SERVER_CLIENT_SYNC, lambda p: self.tick_state(p.data))
+            .on(PacketType.MATCH_FOUND, self.found_match)
+            .on(PacketType.MATCH_END, self.on_match_end)
+        )
+
         super().__init__(ip if ip else "127.0.0.1", 12345)
 
         self.battle_client = BattleClient(self.send)
@@ -178,8 +191,9 @@ class GameNetworkClient(Client):
 
         if self.auth_state.uuid:
             self.send(
-                Packet.from_struct(
-                    PacketType.CLIENT_SERVER_SYNC, DataRequest(self.auth_state.uuid)
+                Packet(
+                    PacketType.CLIENT_SERVER_SYNC,
+                    DataRequest(self.auth_state.uuid).to_bytes(),
                 )
             )
 
@@ -225,21 +239,11 @@ class GameNetworkClient(Client):
 
     def packet_callback(self, packet: Packet):
         # print(packet)
-        do_if(
-            packet, PacketType.CONNECTION, lambda: self.update_connection_status(True)
-        )
-        do_if(packet, PacketType.STATUS, lambda: self.update_status(packet.data))
-        do_if(
-            packet, PacketType.DISCONNECT, lambda: self.update_connection_status(False)
-        )
-        do_if(packet, PacketType.LOGIN_SUCCESS, lambda: self.login_success(packet))
-        do_if(packet, PacketType.LOGIN_FAIL, lambda: self.login_fail(packet))
+        self.router.dispatch(packet)
 
-        do_if(
-            packet, PacketType.SERVER_CLIENT_SYNC, lambda: self.tick_state(packet.data)
-        )
-        do_if(packet, PacketType.MATCH_FOUND, lambda: self.found_match(packet))
-        do_if(packet, PacketType.MATCH_END, lambda: self.on_finish() if self.on_finish is not None else None)
+    def on_match_end(self, packet: Packet) -> None:
+        if self.on_finish is not None:
+            self.on_finish()
 
     def found_match(self, packet: Packet):
         m: MatchFound = MatchFound(**json.loads(packet.data.decode()))
@@ -282,15 +286,10 @@ class GameNetworkClient(Client):
 
 
 class NetworkStateObject(NetworkObject):
+    LOGIN_FAIL_BYTES = bytes(Packet(PacketType.LOGIN_FAIL).serialize_with_length())
+
     def __init__(self):
         super().__init__()
-        self._handles = [
-            PacketType.LOGIN,
-            PacketType.CLIENT_SERVER_SYNC,
-            PacketType.MATCH_REQUEST,
-            PacketType.DEPLOY_UNIT,
-            PacketType.SHOP_PURCHASE
-        ]
         self.users: UserMap = UserMap(
             [
                 User(
@@ -306,7 +305,7 @@ class NetworkStateObject(NetworkObject):
                         0,
                         [
                             Deck(
-                                [
+                                (
                                     GOBLIN_SHAMAN,
                                     ROCK_GOLEM,
                                     ICE_SPIKES,
@@ -315,7 +314,7 @@ class NetworkStateObject(NetworkObject):
                                     EARTHQUAKE,
                                     LUMBERJACK_GOBLIN,
                                     ARCANE_CANNON,
-                                ]
+                                )
                             )
                         ],
                         0,
@@ -326,71 +325,89 @@ class NetworkStateObject(NetworkObject):
             ]
         )
         self.shop = shop_default()
-        self.matchmaking = Matchmaking()
+        self.matchmaking = Matchmaking(self.send)
+        # SHOP_PURCHASE is accepted but has no action yet.
+        self._actions: Dict[PacketType, Callable[[Packet, socket], None]] = {
+            PacketType.LOGIN: self._on_login,
+            PacketType.CLIENT_SERVER_SYNC: self._on_sync,
+            PacketType.MATCH_REQUEST: self._on_match_request,
+            PacketType.DEPLOY_UNIT: self._on_deploy_unit,
+        }
+
+    def get_supported_packets(self) -> List[PacketType]:
+        return [
+            PacketType.LOGIN,
+            PacketType.CLIENT_SERVER_SYNC,
+            PacketType.MATCH_REQUEST,
+            PacketType.DEPLOY_UNIT,
+            PacketType.SHOP_PURCHASE,
+        ]
 
     def handle_packet(self, packet: Packet, client_sock: socket) -> None:
-        if packet.packet_type == PacketType.LOGIN:
-            data = LoginRequest(**json.loads(packet.data.decode()))
-            found = self.users.find(data.username, data.password_hash)
-            if found is not None:
-                client_sock.sendall(
-                    Packet.from_struct(
-                        PacketType.LOGIN_SUCCESS,
-                        LoginResponse(found.uuid, found.username),
-                    ).serialize_with_length()
-                )
-            else:
-                client_sock.sendall(
-                    Packet(PacketType.LOGIN_FAIL).serialize_with_length()
-                )
-        elif packet.packet_type == PacketType.CLIENT_SERVER_SYNC:
-            data = DataRequest(**json.loads(packet.data.decode()))
-            found = self.users.find_uuid(data.uuid)
-            if found is not None:
-                state = GameState(None, None)
-                state.menu_state = MenuState(
-                    found.data.chests,
-                    found.data.clan,
-                    self.shop,
-                    found.data.decks,
-                    found.data.current_deck,
-                    found.data.trophies,
+        action = self._actions.get(packet.packet_type)
+        if action is not None:
+            action(packet, client_sock)
+
+    def _on_login(self, packet: Packet, client_sock: socket) -> None:
+        data = LoginRequest(**json.loads(packet.data.decode()))
+        found = self.users.find(data.username, data.password_hash)
+        if found is not None:
+            self.send(
+                client_sock,
+                Packet.from_struct(
+                    PacketType.LOGIN_SUCCESS,
+                    LoginResponse(found.uuid, found.username),
+                ),
+            )
+        else:
+            self.send_bytes(client_sock, self.LOGIN_FAIL_BYTES)
+
+    def _on_sync(self, packet: Packet, client_sock: socket) -> None:
+        data = DataRequest.from_bytes(packet.data)
+        found = self.users.find_uuid(data.uuid)
+        if found is not None:
+            state = GameState(None, None)
+            state.menu_state = MenuState(
+                found.data.chests,
+                found.data.clan,
+                self.shop,
+                found.data.decks,
+                found.data.current_deck,
+                found.data.trophies,
+            )
+
+            if found.data.current_battle:
+                found_match, other_uuid, arena = self.matchmaking.get_match(
+                    found.data.current_battle, data.uuid
                 )
 
-                if found.data.current_battle:
-                    found_match, other_uuid, arena = self.matchmaking.get_match(
-                        found.data.current_battle, data.uuid
+                if found_match and other_uuid and arena:
+                    state.battle_state = BattleState(
+                        found_match.elixir,
+                        found_match.hand,
+                        found_match.next_card,
+                        found.data.current_battle,
+                        other_uuid,
+                        arena,
                     )
 
-                    if found_match and other_uuid and arena:
-                        state.battle_state = BattleState(
-                            found_match.elixir,
-                            found_match.hand,
-                            found_match.next_card,
-                            found.data.current_battle,
-                            other_uuid,
-                            arena,
-                        )
-
-                client_sock.sendall(
-                    Packet.from_struct(
-                        PacketType.SERVER_CLIENT_SYNC, state
-                    ).serialize_with_length()
-                )
-        elif packet.packet_type == PacketType.MATCH_REQUEST:
-            data = json.loads(
-                packet.data.decode(), object_hook=lambda d: SimpleNamespace(**d)
+            self.send(
+                client_sock, Packet.from_struct(PacketType.SERVER_CLIENT_SYNC, state)
             )
 
-            self.matchmaking.request(data, client_sock)
-        elif packet.packet_type == PacketType.DEPLOY_UNIT:
-            data = json.loads(
-                packet.data.decode(), object_hook=lambda d: SimpleNamespace(**d)
-            )
+    def _on_match_request(self, packet: Packet, client_sock: socket) -> None:
+        data = json.loads(
+            packet.data.decode(), object_hook=lambda d: SimpleNamespace(**d)
+        )
+
+        self.matchmaking.request(data, client_sock)
+
+    def _on_deploy_unit(self, packet: Packet, client_sock: socket) -> None:
+        data = json.loads(
+            packet.data.decode(), object_hook=lambda d: SimpleNamespace(**d)
+        )
 
-            self.matchmaking.deploy_unit(data, data.battle_id)
-        elif packet.packet_type == PacketType.SHOP_PURCHASE:
-            pass
+        self.matchmaking.deploy_unit(data, data.battle_id)
 
     def tick(self):
         self.matchmaking.tick(
@@ -31,29 +31,37 @@ from unit import (
 from util import DATE_FORMAT, Mutex, Pair
 from util import logger
 
-@dataclass 
+@dataclass(slots=True)
 class MatchEndData:
     won: bool
 
 MAX_TROPHY_DIFF = 100
 
 
-@dataclass
+@dataclass(slots=True)
 class MatchRequestSocket:
     inner: MatchRequest
     sock: socket
 
 
+# Queues a packet for a client socket; the server's reactor does the writing.
+SendFn = Callable[[socket, Packet], None]
+
+
 class MatchThread:
     MAX_ELIXIR = 10
     ELIXIR_TICK_TIME = 1
 
-    def __init__(self, initial_state: Battle) -> None:
+    def __init__(self, initial_state: Battle, send: SendFn) -> None:
+        self.send = send
         self.thread = threading.Thread(target=self.loop, daemon=True)
         self.fixed_thread = threading.Thread(target=self.fixed_tick, daemon=True)
-        self.state = Mutex(initial_state)
+        # Published by plain attribute rebinding (atomic under the GIL) so readers
+        # never take a lock; writers mutate the battle in place.
+        self._state: Battle = initial_state
         self.finished = Mutex(False)
         self.arena = Arena()
+        self.rng = random.Random()
         self.stop_threads = threading.Event()
         self.thread.start()
         self.fixed_thread.start()
@@ -70,7 +78,6 @@ class MatchThread:
 
     def loop(self) -> None:
         while not self.stop_threads.is_set():
-            print("i")
             start_time = time.monotonic()
             self.tick()
             elapsed_time = time.monotonic() - start_time
@@ -79,10 +86,7 @@ class MatchThread:
                 time.sleep(sleep_time)
 
     def tick(self) -> None:
-        state = self.state.get_data()
-
-        if not state:
-            return
+        state = self._state
 
         if state.p1.elixir < self.MAX_ELIXIR:
             state.p1.elixir += 1
@@ -90,14 +94,9 @@ class MatchThread:
         if state.p2.elixir < self.MAX_ELIXIR:
             state.p2.elixir += 1
 
-        self.state.set_data(state)
-
     def fixed_tick(self) -> None:
         while not self.stop_threads.is_set():
-            state = self.state.get_data()
-
-            if not state:
-                continue
+            state = self._state
 
             state.units = self.arena.tick(state.units)
 
@@ -110,49 +109,40 @@ class MatchThread:
                 if unit.inner.underlying.hitpoints is not None:
                     if unit.inner.unit_data.hitpoints <= 0:
                         state.units.remove(unit)
-                        print("================== DEAD ==================")
+                        logger.debug("unit %s died", unit.id)
 
             if self.arena.has_won(Owner.P1):
                 self.winner = state.p1.uuid
                 self.loser = state.p2.uuid
 
-                try:
-                    state.p1.sock.sendall(Packet.from_struct(PacketType.MATCH_END, MatchEndData(True)).serialize_with_length())
-                    state.p2.sock.sendall(Packet.from_struct(PacketType.MATCH_END, MatchEndData(False)).serialize_with_length())
-                except:
-                    pass
+                self.send(state.p1.sock, Packet.from_struct(PacketType.MATCH_END, MatchEndData(True)))
+                self.send(state.p2.sock, Packet.from_struct(PacketType.MATCH_END, MatchEndData(False)))
 
                 self.finished.set_data(True)
             elif self.arena.has_won(Owner.P2):
                 self.winner = state.p2.uuid
                 self.loser = state.p1.uuid
 
-                try:
-                    state.p1.sock.sendall(Packet.from_struct(PacketType.MATCH_END, MatchEndData(False)).serialize_with_length())
-                    state.p2.sock.sendall(Packet.from_struct(PacketType.MATCH_END, MatchEndData(True)).serialize_with_length())
-                except:
-                    pass
+                self.send(state.p1.sock, Packet.from_struct(PacketType.MATCH_END, MatchEndData(False)))
+                self.send(state.p2.sock, Packet.from_struct(PacketType.MATCH_END, MatchEndData(True)))
 
                 self.finished.set_data(True)
 
             if self.arena.has_won(Owner.P1) or self.arena.has_won(Owner.P2):
                 self.stop_threads.set()
 
-            self.state.set_data(state)
+            self._state = state
 
     def is_finished(self) -> bool:
         return self.finished.get_data() or False
 
     def get_state(self) -> Battle:
-        data = self.state.get_data()
-        if not data:
-            raise ValueError("State Data is null")
-        return data
+        return self._state
 
     def add_unit(self, unit: Unit) -> None:
-        state = self.state.get_data()
+        state = self._state
 
-        if not state or unit.underlying.card_type == CardType.SPELL.value:
+        if unit.underlying.card_type == CardType.SPELL.value:
             return
 
         u = IDUnit.from_unit(unit)
@@ -164,31 +154,28 @@ class MatchThread:
         elif unit.owner == Owner.P2:
             state.p2.elixir = state.p2.elixir - unit.underlying.elixir_cost
 
-        self.state.set_data(state)
-
         self.get_next_hand(unit.owner, unit.underlying)
 
         logger.info("Unit Deployed")
 
     def get_player_as_enum(self, uuid: str) -> Optional[Owner]:
-        d = self.state.get_data()
-        if d and d.p1.uuid == uuid:
+        d = self._state
+        if d.p1.uuid == uuid:
             return Owner.P1
-        elif d and d.p2.uuid == uuid:
+        elif d.p2.uuid == uuid:
             return Owner.P2
         return None
 
     def get_next_hand(self, player: Owner, played: Card) -> None:
-        state = self.state.get_data()
+        state = self._state
 
         if (
-            not state
-            or not state.p1.next_card
+            not state.p1.next_card
             or not state.p1.deck
             or not state.p2.next_card
             or not state.p2.deck
         ):
-            print("no state")
+            logger.debug("no next card or deck to deal from")
             return
 
         if player == Owner.P1:
@@ -201,15 +188,13 @@ class MatchThread:
             remaining = state.p1.remaining_in_deck.copy()
 
             if len(remaining) == 0:
-                d = state.p1.deck.cards.copy()
-                random.shuffle(d)
+                d = list(state.p1.deck.cards)
+                self.rng.shuffle(d)
                 state.p1.remaining_in_deck = d.copy()
             else:
                 state.p1.remaining_in_deck = remaining
 
             state.p1.next_card = state.p1.remaining_in_deck.pop()
-
-            self.state.set_data(state)
         else:
             hand = state.p2.hand.copy()
             hand.remove(played)
@@ -220,21 +205,21 @@ class MatchThread:
             remaining = state.p2.remaining_in_deck.copy()
 
             if len(remaining) == 0:
-                d = state.p2.deck.cards.copy()
-                random.shuffle(d)
+                d = list(state.p2.deck.cards)
+                self.rng.shuffle(d)
                 state.p2.remaining_in_deck = d
             else:
                 state.p2.remaining_in_deck = remaining
 
             state.p2.next_card = state.p2.remaining_in_deck.pop()
 
-            self.state.set_data(state)
-
 
 class Matchmaking:
-    def __init__(self) -> None:
+    def __init__(self, send: SendFn) -> None:
+        self.send = send
         self.waiting: List[MatchRequestSocket] = []
         self.matches: Dict[str, MatchThread] = {}
+        self.rng = random.Random()
 
     def request(self, d: MatchRequest, s: socket) -> None:
         for c in self.waiting:
@@ -243,7 +228,7 @@ class Matchmaking:
 
         for m in self.matches.values():
             if m.get_state().p1.uuid == d.uuid or m.get_state().p2.uuid == d.uuid:
-                print(m)
+                logger.debug("%s is already in a match", d.uuid)
                 return
 
         # print(d)
@@ -254,8 +239,8 @@ class Matchmaking:
         for match in self.matches.keys():
             m = self.matches[match]
             if self.matches[match] and self.matches[match].is_finished() and m.winner and m.loser:
-                update_trophies(m.winner, random.randint(25, 35))
-                update_trophies(m.loser, -random.randint(25, 35))
+                update_trophies(m.winner, self.rng.randint(25, 35))
+                update_trophies(m.loser, -self.rng.randint(25, 35))
                 new_matches.pop(match)
 
         self.matches = new_matches.copy()
@@ -286,27 +271,16 @@ class Matchmaking:
     def get_match(
         self, uuid: str, player_uuid: str
     ) -> Tuple[Optional[NetworkPlayer], Optional[str], Optional[Arena]]:
-        return next(
-            (
-                (
-                    p,
-                    (
-                        m.get_state().p2.uuid
-                        if p is m.get_state().p1
-                        else m.get_state().p1.uuid
-                    ),
-                    m.arena,
-                )
-                for m in [self.matches.get(uuid)]
-                if m
-                for p in [
-                    network_player(m.get_state().p1),
-                    network_player(m.get_state().p2),
-                ]
-                if p.uuid == player_uuid
-            ),
-            (None, None, None),
-        )
+        m = self.matches.get(uuid)
+        if not m:
+            return (None, None, None)
+
+        s = m.get_state()
+        if s.p1.uuid == player_uuid:
+            return network_player(s.p1), s.p2.uuid, m.arena
+        if s.p2.uuid == player_uuid:
+            return network_player(s.p2), s.p1.uuid, m.arena
+        return (None, None, None)
 
     def are_compatible(self, req1: MatchRequest, req2: MatchRequest) -> bool:
         trophy_difference = abs(req1.trophies - req2.trophies)
@@ -314,18 +288,16 @@ class Matchmaking:
 
     def handle_match(self, req1: MatchRequestSocket, req2: MatchRequestSocket) -> str:
         id = str(uuid4())
-        p1_initial = random.sample(req1.inner.deck.cards, 4)
-        p1_remaining = [
-            item for item in req1.inner.deck.cards if item not in p1_initial
-        ]
-        random.shuffle(p1_remaining)
+        p1_remaining = list(req1.inner.deck.cards)
+        self.rng.shuffle(p1_remaining)
+        p1_initial = p1_remaining[:4]
+        del p1_remaining[:4]
         p1_next = p1_remaining.pop()
 
-        p2_initial = random.sample(req2.inner.deck.cards, 4)
-        p2_remaining = [
-            item for item in req2.inner.deck.cards if item not in p2_initial
-        ]
-        random.shuffle(p2_remaining)
+        p2_remaining = list(req2.inner.deck.cards)
+        self.rng.shuffle(p2_remaining)
+        p2_initial = p2_remaining[:4]
+        del p2_remaining[:4]
         p2_next = p2_remaining.pop()
 
         self.matches.update(
@@ -352,22 +324,25 @@ class Matchmaking:
                         ),
                         id,
                         [],
-                    )
+                    ),
+                    self.send,
                 ),
             }
         )
 
-        print(req1, req2)
+        logger.debug("matched %s with %s", req1.inner.uuid, req2.inner.uuid)
 
-        req1.sock.sendall(
+        self.send(
+            req1.sock,
             Packet.from_struct(
                 PacketType.MATCH_FOUND, MatchFound(id, req2.inner.uuid, "Player 1")
-            ).serialize_with_length()
+            ),
         )
-        req2.sock.sendall(
+        self.send(
+            req2.sock,
             Packet.from_struct(
                 PacketType.MATCH_FOUND, MatchFound(id, req1.inner.uuid, "Player 2")
-            ).serialize_with_length()
+            ),
         )
 
         logging.info("Match Found")
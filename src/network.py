@@ -1,27 +1,40 @@
 from abc import ABCMeta, abstractmethod
-from collections import abc
-from dataclasses import dataclass, fields
-import enum
+from collections import abc, deque
+from dataclasses import dataclass, field, fields, is_dataclass
 from random import randint, random
 import socket
 import struct
 import threading
 import json
-from time import sleep, time
-from typing import Callable, List, Optional, Dict, Any, Self, Type, get_type_hints
+from time import monotonic, sleep, time
+from typing import (
+    Callable,
+    Deque,
+    List,
+    Optional,
+    Dict,
+    Any,
+    Self,
+    Tuple,
+    Type,
+    Union,
+    get_type_hints,
+)
 from game_packet import PacketType
-from util import logger
+from util import Pair, logger
 import select
+import selectors
 from uuid import uuid4
 from enum import Enum
 
 
-@dataclass
+@dataclass(slots=True)
 class ServerStatus:
     pass
 
 
-import enum
+# Wire value -> PacketType, avoiding the Enum constructor on every received packet.
+PACKET_TYPES: Dict[int, PacketType] = {m.value: m for m in PacketType}
 
 
 def deserialize_object(data: Any, target_type: Type[Any]) -> Any:
@@ -160,14 +173,23 @@ def serialize_object(obj: Any):
         return {
             serialize_object(key): serialize_object(value) for key, value in obj.items()
         }
-    elif isinstance(obj, enum.Enum):  # handle enums
+    elif isinstance(obj, Enum):  # handle enums
         return obj.value
+    elif isinstance(obj, Pair):  # Slotted, so it has no __dict__ to walk
+        first, second = obj.to_tuple()
+        return {"first": serialize_object(first), "second": serialize_object(second)}
     elif hasattr(obj, "__dict__"):  # Handle custom objects
         result = {}
         for key, value in obj.__dict__.items():
             if not key.startswith("_"):  # prevent serializing private variables
                 result[key] = serialize_object(value)
         return result
+    elif is_dataclass(obj):  # Handle slotted dataclasses
+        return {
+            f.name: serialize_object(getattr(obj, f.name))
+            for f in fields(obj)
+            if not f.name.startswith("_")
+        }
     else:
         raise TypeError(f"Type {type(obj)} ({obj}) is not JSON serializable")
 
@@ -179,35 +201,77 @@ def recv_all(
     id: Optional[str] = None,
 ) -> Optional[bytes]:
     """Receives exactly 'length' bytes from the socket with an optional timeout."""
-    data = b""
-    remaining = length
+    buf = bytearray(length)
+    view = memoryview(buf)
+    offset = 0
 
-    while remaining > 0:
+    while offset < length:
         if timeout is not None:
             readable, _, _ = select.select([sock], [], [], timeout)
             if not readable:
                 return None
 
         try:
-            chunk = sock.recv(remaining)
+            n = sock.recv_into(view[offset:])
         except socket.timeout:
             return None
 
-        if not chunk:
+        if n == 0:
             # raise ConnectionError(f"[{id}] Socket closed during recv_all")
             return b""
 
-        data += chunk
-        remaining -= len(chunk)
+        offset += n
+
+    return bytes(buf)
+
+
+SOCKET_BUFFER_SIZE = 1 << 20
+MSG_MORE = getattr(socket, "MSG_MORE", 0)
+TCP_QUICKACK = getattr(socket, "TCP_QUICKACK", None)
+
+
+def tune_socket(sock: socket.socket) -> None:
+    """Applies the socket options used for every game connection."""
+    # Packets are small and latency sensitive; don't let Nagle hold them back.
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    if TCP_QUICKACK is not None:
+        # Not sticky: Linux drops back to delayed ACKs after the next one, so
+        # PacketReader.recv re-arms it after every read.
+        sock.setsockopt(socket.IPPROTO_TCP, TCP_QUICKACK, 1)
+    # Larger kernel buffers so a status/broadcast fan-out doesn't stall on a
+    # full send buffer.
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+
+
+def size_receive_buffer(sock: socket.socket) -> None:
+    """
+    Enlarges the socket's receive buffer. Must run before listen() or
+    connect(): the TCP window scale is negotiated during the handshake, so a
+    buffer raised afterwards can't be fully advertised. Accepted sockets
+    inherit the listening socket's size.
+    """
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+
 
-    return data
+def send_all(
+    sock: socket.socket, data: Union[bytes, bytearray], flags: int = 0
+) -> None:
+    """
+    Writes all of data to a blocking socket. The server's client sockets are
+    non-blocking and owned by its reactor; write to those through
+    Server.send instead.
+    """
+    sock.sendall(data, flags)
 
 
 class Packet:
     """Represents a network packet that is serialized for transmission."""
 
+    __slots__ = ("packet_type", "data")
+
     HEADER_FORMAT = "<II"
-    HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+    HEADER = struct.Struct(HEADER_FORMAT)
+    HEADER_SIZE = HEADER.size
 
     def __init__(self, packet_type: PacketType, data: Optional[bytes] = None):
         self.packet_type = packet_type
@@ -217,11 +281,41 @@ class Packet:
     def from_struct(cls, packet_type: PacketType, s: object):
         return cls(packet_type, json.dumps(serialize_object(s)).encode())
 
-    def serialize_with_length(self) -> bytes:
+    def serialize_with_length(self) -> bytearray:
         """Serializes the packet into bytes with length headers."""
         data_length = len(self.data)
-        header = struct.pack(self.HEADER_FORMAT, self.packet_type.value, data_length)
-        return header + self.data
+        out = bytearray(self.HEADER_SIZE + data_length)
+        self.HEADER.pack_into(out, 0, self.packet_type.value, data_length)
+        out[self.HEADER_SIZE :] = self.data
+        return out
+
+    def send_on(self, sock: socket.socket) -> None:
+        """
+        Sends the packet on a blocking socket without first concatenating
+        header and body, handing both buffers to the kernel in one sendmsg call
+        where it is available. Without sendmsg, MSG_MORE (where supported) keeps
+        the header queued in the kernel until the body follows, so it still
+        leaves as one segment.
+        """
+        header = self.HEADER.pack(self.packet_type.value, len(self.data))
+        if not hasattr(sock, "sendmsg"):
+            if MSG_MORE and self.data:
+                send_all(sock, header, MSG_MORE)
+                send_all(sock, self.data)
+            else:
+                send_all(sock, header + self.data)
+            return
+
+        buffers = [memoryview(b) for b in (header, self.data) if b]
+        while buffers:
+            sent = sock.sendmsg(buffers)
+            while sent:
+                if sent >= len(buffers[0]):
+                    sent -= len(buffers[0])
+                    buffers.pop(0)
+                else:
+                    buffers[0] = buffers[0][sent:]
+                    sent = 0
 
     @staticmethod
     def from_socket(
@@ -239,10 +333,9 @@ class Packet:
         if len(header) != Packet.HEADER_SIZE:
             return None
 
-        packet_type_val, data_length = struct.unpack(Packet.HEADER_FORMAT, header)
-        try:
-            packet_type = PacketType(packet_type_val)
-        except ValueError:
+        packet_type_val, data_length = Packet.HEADER.unpack_from(header)
+        packet_type = PACKET_TYPES.get(packet_type_val)
+        if packet_type is None:
             return None
 
         data = recv_all(sock, data_length)
@@ -252,11 +345,75 @@ class Packet:
         return f"<Packet type={self.packet_type}>"
 
 
+class SendBuffer:
+    """
+    Write-combining outgoing buffer for a single client socket.
+    Any thread may enqueue packets; only the server reactor writes them out,
+    with non-blocking sends, so bytes from different threads never interleave
+    on the stream and a slow peer never blocks the reactor.
+    """
+
+    # A peer that lets this much pile up isn't reading; it gets dropped.
+    MAX_BUFFERED = 16 * 1024 * 1024
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self.out = bytearray()
+        self.lock = threading.Lock()
+        self.overflowed = False
+
+    def enqueue(self, data: bytes) -> bool:
+        """
+        Appends data to the buffer, flagging it as overflowed past MAX_BUFFERED.
+        Returns True when the reactor needs telling: the buffer was empty (so no
+        flush is pending yet) or it just overflowed.
+        """
+        with self.lock:
+            if len(self.out) + len(data) > self.MAX_BUFFERED:
+                self.overflowed = True
+                return True
+            was_empty = not self.out
+            self.out += data
+            return was_empty
+
+    def flush(self) -> bool:
+        """
+        Writes as much as the socket accepts without blocking. Returns True once
+        everything queued has been sent; raises OSError if the connection failed.
+        """
+        with self.lock:
+            out = self.out
+            while out:
+                try:
+                    n = self.sock.send(out)
+                except BlockingIOError:
+                    return False
+                del out[:n]
+            return True
+
+
 class NetworkObject:
     """Base class for handling specific packet types."""
 
     def __init__(self):
-        self._handles = self.get_supported_packets()
+        self._handles: frozenset[PacketType] = frozenset(self.get_supported_packets())
+        # Set by the Server this handler is added to.
+        self.server: Optional["Server"] = None
+
+    def send(self, client_sock: socket.socket, packet: Packet) -> None:
+        """
+        Queues packet for a client through the owning server's reactor. Safe
+        from any thread; never write to a server-side client socket directly.
+        """
+        if self.server is None:
+            raise RuntimeError("NetworkObject is not attached to a Server")
+        self.server.send(client_sock, packet)
+
+    def send_bytes(self, client_sock: socket.socket, data: bytes) -> None:
+        """Like send, for a packet that is already serialized with its length."""
+        if self.server is None:
+            raise RuntimeError("NetworkObject is not attached to a Server")
+        self.server.send_bytes(client_sock, data)
 
     def handle_packet(self, packet: Packet, client_sock: socket.socket) -> None:
         """Override this method to handle incoming packets."""
@@ -277,23 +434,130 @@ class NetworkObject:
         pass
 
 
+class PacketReader:
+    """
+    Reassembles packets from a stream socket.
+    Each read pulls as much as is available in one recv and parses every
+    complete packet it contains, instead of two reads per packet.
+    """
+
+    RECV_SIZE = 64 * 1024
+    COMPACT_AT = 64 * 1024
+
+    def __init__(self) -> None:
+        self.buf = bytearray()
+        self.rpos = 0
+        self._scratch = bytearray(self.RECV_SIZE)
+        self._view = memoryview(self._scratch)
+
+    def recv(self, sock: socket.socket) -> Optional[List[Packet]]:
+        """
+        Performs one recv. Returns the packets completed by it (possibly none,
+        including when a non-blocking socket had nothing to read), or None once
+        the peer has closed.
+        """
+        try:
+            n = sock.recv_into(self._view)
+        except BlockingIOError:
+            return []
+        if n == 0:
+            return None
+        if TCP_QUICKACK is not None:
+            # The kernel leaves quick-ack mode after ACKing; turn it back on so
+            # the next incoming packet is ACKed at once, not on the delayed-ACK
+            # timer.
+            sock.setsockopt(socket.IPPROTO_TCP, TCP_QUICKACK, 1)
+        self.buf += self._view[:n]
+        return self._parse()
+
+    def _parse(self) -> List[Packet]:
+        packets: List[Packet] = []
+        unpack_header = Packet.HEADER.unpack_from
+        packet_types = PACKET_TYPES
+        buf = self.buf
+        rpos = self.rpos
+        end = len(buf)
+
+        while end - rpos >= Packet.HEADER_SIZE:
+            packet_type_val, data_length = unpack_header(buf, rpos)
+            start = rpos + Packet.HEADER_SIZE
+            if end - start < data_length:
+                break
+            rpos = start + data_length
+
+            packet_type = packet_types.get(packet_type_val)
+            if packet_type is None:
+                logger.warning(f"Unknown packet type: {packet_type_val}")
+                continue
+            packets.append(Packet(packet_type, bytes(buf[start:rpos])))
+
+        if rpos == end or rpos >= self.COMPACT_AT:
+            del buf[:rpos]
+            rpos = 0
+        self.rpos = rpos
+
+        return packets
+
+
+@dataclass(slots=True)
+class ConnState:
+    """Per-connection state kept by the server reactor."""
+
+    sock: socket.socket
+    out: SendBuffer
+    reader: PacketReader = field(default_factory=PacketReader)
+    # Selector interest; EVENT_WRITE is only armed while output is pending.
+    events: int = selectors.EVENT_READ
+
+
 class Server:
     """Multiplayer game server that manages clients and game state."""
 
+    STATUS_INTERVAL = 0.1
+    TICK_INTERVAL = 0.1
+    # Sent to every new client; it has no payload so its wire bytes never change.
+    CONNECTION_BYTES = bytes(Packet(PacketType.CONNECTION).serialize_with_length())
+
     def __init__(self, port: int, handlers: List[NetworkObject]) -> None:
         self.port = port
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.server_socket.bind(("0.0.0.0", port))
+        size_receive_buffer(self.server_socket)
         self.server_socket.listen()
-        self.clients: List[socket.socket] = []
+        # Copy-on-write snapshots: writers rebuild them under self.lock, readers
+        # just take the current reference without locking.
+        self.clients: Tuple[socket.socket, ...] = ()
+        self._conns: Tuple[ConnState, ...] = ()
+        self.connections: Dict[socket.socket, ConnState] = {}
         self.lock = threading.Lock()
 
+        self.handlers: List[NetworkObject] = handlers
+        for handler in handlers:
+            handler.server = self
+        self._dispatch: Dict[PacketType, Tuple[NetworkObject, ...]] = {}
+        self._rebuild_dispatch()
+
+        self.status = ServerStatus()
+        self._status_rev = 0
+        self._last_status_rev = -1
+        self._last_status_payload = b""
+
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.server_socket, selectors.EVENT_READ, self._accept)
+        # Connections with freshly queued output, flushed at the end of the
+        # reactor iteration. Other threads also poke the wake socket so a
+        # reactor sleeping in select() gets to them straight away.
+        self._pending: Deque[ConnState] = deque()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self.selector.register(self._wake_r, selectors.EVENT_READ, self._on_wake)
+        self._reactor_ident: Optional[int] = None
+
         self.server_thread = threading.Thread(target=self._run, daemon=True)
         self.server_thread.start()
 
-        self.handlers: List[NetworkObject] = handlers
-
         hostname = socket.gethostname()
         ip_address = socket.gethostbyname(hostname)
         logger.info(f"Server listening on {ip_address}:{port}")
@@ -301,77 +565,226 @@ class Server:
         threading.Thread(target=self._broadcast_loop, daemon=True).start()
 
     def _run(self):
-        """Runs the server loop, accepting connections and handling clients."""
+        """
+        Runs the reactor: a single thread multiplexes the listening socket and
+        every client, and pushes the periodic status packet to all clients.
+        """
+        self._reactor_ident = threading.get_ident()
+        next_status = monotonic()
         while True:
-            client_sock, addr = self.server_socket.accept()
-            logger.info(f"Client connected: {addr}")
-            with self.lock:
-                self.clients.append(client_sock)
-            threading.Thread(
-                target=self.handle_client, args=(client_sock,), daemon=True
-            ).start()
-            threading.Thread(
-                target=self.handle_client_conn, args=(client_sock,), daemon=True
-            ).start()
-
-    def handle_client(self, client_sock: socket.socket):
-        """Handles client messages and packet processing."""
+            timeout = 0.0 if self._pending else max(0.0, next_status - monotonic())
+            for key, mask in self.selector.select(timeout):
+                try:
+                    key.data(key.fileobj, mask)
+                except Exception as e:
+                    # One bad connection must not take the reactor down with it.
+                    logger.warning(f"Error servicing connection: {e}")
+                    if key.fileobj in self.connections:
+                        self._drop_client(key.fileobj)
+
+            if monotonic() >= next_status:
+                next_status = monotonic() + self.STATUS_INTERVAL
+                self._send_status()
+
+            # Replies and broadcasts queued during this iteration go out now
+            # rather than waiting for the next status tick.
+            pending = self._pending
+            while pending:
+                self._flush_conn(pending.popleft())
+
+    def _on_wake(self, wake_sock: socket.socket, mask: int) -> None:
+        try:
+            while wake_sock.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _queue(self, conn: ConnState, data: bytes) -> None:
+        """Queues data on the connection and makes sure the reactor will flush it."""
+        if not conn.out.enqueue(data):
+            return  # Already pending or waiting on EVENT_WRITE.
+        self._pending.append(conn)
+        if threading.get_ident() != self._reactor_ident:
+            try:
+                self._wake_w.send(b"\0")
+            except BlockingIOError:
+                pass  # The reactor already has wake-ups to read.
+
+    def _accept(self, server_socket: socket.socket, mask: int) -> None:
+        client_sock, addr = server_socket.accept()
+        tune_socket(client_sock)
+        # The reactor only reads once the selector reports data and only writes
+        # what the socket accepts, so it never blocks on a client.
+        client_sock.setblocking(False)
+        logger.info(f"Client connected: {addr}")
+
+        conn = ConnState(client_sock, SendBuffer(client_sock))
+        with self.lock:
+            self.connections[client_sock] = conn
+            self.clients = self.clients + (client_sock,)
+            self._conns = self._conns + (conn,)
+        self.selector.register(client_sock, conn.events, self._on_client_event)
 
         for handler in self.handlers:
             handler.on_connection()
 
-        while True:
-            try:
-                packet = Packet.from_socket(client_sock, timeout=False)
-                if packet is None:
-                    break
+        self._queue(conn, self.CONNECTION_BYTES)
+
+    def _on_client_event(self, client_sock: socket.socket, mask: int) -> None:
+        if mask & selectors.EVENT_READ:
+            self._on_client_data(client_sock)
+        if mask & selectors.EVENT_WRITE:
+            conn = self.connections.get(client_sock)
+            if conn is not None:
+                self._flush_conn(conn)
+
+    def _flush_conn(self, conn: ConnState) -> None:
+        """
+        Writes out what the connection's buffer holds without blocking, and
+        keeps EVENT_WRITE armed only while some of it is still pending. Drops
+        the client if its buffer overflowed or the write failed.
+        """
+        if self.connections.get(conn.sock) is not conn:
+            return
+        if conn.out.overflowed:
+            logger.warning("Client is not reading its data; dropping it")
+            self._drop_client(conn.sock)
+            return
+        try:
+            drained = conn.out.flush()
+        except OSError as e:
+            logger.warning(f"Client disconnected: {e}")
+            self._drop_client(conn.sock)
+            return
+        events = (
+            selectors.EVENT_READ
+            if drained
+            else selectors.EVENT_READ | selectors.EVENT_WRITE
+        )
+        if events != conn.events:
+            conn.events = events
+            self.selector.modify(conn.sock, events, self._on_client_event)
+
+    def _on_client_data(self, client_sock: socket.socket) -> None:
+        """Reads whatever is available and dispatches each packet once it is complete."""
+        conn = self.connections.get(client_sock)
+        if conn is None:
+            return  # Dropped by another thread since the selector reported it.
+        try:
+            packets = conn.reader.recv(client_sock)
+        except OSError as e:
+            packets = None
+            logger.warning(f"Client disconnected: {e}")
+
+        if packets is None:
+            self._drop_client(client_sock)
+            return
 
+        for packet in packets:
+            try:
                 self.process_packet(packet, client_sock)
-            except (ConnectionError, Exception) as e:
-                logger.warning(f"Client disconnected: {e}")
+            except Exception as e:
+                logger.warning(f"Error handling packet: {e}")
+
+    def set_status(self, status: ServerStatus) -> None:
+        """Replaces the status sent to clients; it is re-encoded on the next status tick."""
+        self.status = status
+        self._status_rev += 1
+
+    def _send_status(self) -> None:
+        if self._status_rev != self._last_status_rev:
+            self._last_status_rev = self._status_rev
+            self._last_status_payload = Packet(
+                PacketType.STATUS, json.dumps(serialize_object(self.status)).encode()
+            ).serialize_with_length()
+        status_packet = self._last_status_payload
+
+        for conn in self._conns:
+            self._queue(conn, status_packet)
+
+    def _drop_client(self, client_sock: socket.socket) -> None:
+        self._drop_clients([client_sock])
+
+    def _drop_clients(self, dead: List[socket.socket]) -> None:
+        with self.lock:
+            for client_sock in dead:
+                self.connections.pop(client_sock, None)
+            self.clients = tuple(c for c in self.clients if c in self.connections)
+            self._conns = tuple(c for c in self._conns if c.sock in self.connections)
+        for client_sock in dead:
+            try:
+                self.selector.unregister(client_sock)
+            except (KeyError, ValueError):
+                pass
+            client_sock.close()
+
+    def _rebuild_dispatch(self) -> None:
+        """Rebuilds the PacketType -> handlers table; call whenever self.handlers changes."""
+        dispatch: Dict[PacketType, List[NetworkObject]] = {}
+        for handler in self.handlers:
+            for packet_type in handler._handles:
+                dispatch.setdefault(packet_type, []).append(handler)
+        self._dispatch = {t: tuple(h) for t, h in dispatch.items()}
 
-    def handle_client_conn(self, client_sock: socket.socket):
-        connection_packet = Packet(PacketType.CONNECTION)
-        client_sock.sendall(connection_packet.serialize_with_length())
+    def add_handler(self, handler: NetworkObject) -> None:
+        handler.server = self
+        self.handlers.append(handler)
+        self._rebuild_dispatch()
 
-        while True:
-            try:
-                status_packet = Packet(
-                    PacketType.STATUS, json.dumps(ServerStatus().__dict__).encode()
-                )
-                client_sock.sendall(status_packet.serialize_with_length())
-                sleep(0.1)
-            except (ConnectionError, Exception) as e:
-                logger.warning(f"Client connection handler disconnected: {e}")
-                with self.lock:
-                    if client_sock in self.clients:
-                        self.clients.remove(client_sock)
-                break
+    def remove_handler(self, handler: NetworkObject) -> None:
+        self.handlers.remove(handler)
+        self._rebuild_dispatch()
 
     def process_packet(self, packet: Packet, client_sock: socket.socket):
         """Finds the appropriate handler for a received packet."""
-        handled = False
-        for handler in self.handlers:
-            if handler.check_handles(packet.packet_type):
-                handler.handle_packet(packet, client_sock)
-                handled = True
-
-        if not handled:
+        handlers = self._dispatch.get(packet.packet_type)
+        if not handlers:
             logger.warning(f"Packet not handled: {packet}")
+            return
+
+        for handler in handlers:
+            handler.handle_packet(packet, client_sock)
+
+    def send(self, client_sock: socket.socket, packet: Packet) -> None:
+        """Queues a packet on the client's buffer; the reactor flushes it right away."""
+        self.send_bytes(client_sock, packet.serialize_with_length())
+
+    def send_bytes(self, client_sock: socket.socket, data: bytes) -> None:
+        """Like send, for a packet that is already serialized with its length."""
+        conn = self.connections.get(client_sock)
+        if conn is None:
+            logger.debug("Dropping %d bytes for a client that is gone", len(data))
+            return
+        self._queue(conn, data)
 
     def broadcast_packet(self, packet: Packet):
-        for client in self.clients:
-            client.sendall(packet.serialize_with_length())
+        """Serializes once and queues the bytes for a snapshot of the connected clients."""
+        payload = packet.serialize_with_length()
+        for conn in self._conns:
+            self._queue(conn, payload)
 
     @abstractmethod
     def tick(self) -> None:
         pass
 
     def _broadcast_loop(self):
+        """
+        Ticks the server and its handlers every TICK_INTERVAL seconds. Sleeps
+        until a monotonic deadline so the cost of a tick does not stretch the
+        period; if a tick overruns, the schedule restarts from now instead of
+        bursting to catch up.
+        """
+        next_tick = monotonic()
         while True:
             self.tick()
-            [o.tick() for o in self.handlers]
-            sleep(0.1)
+            for o in self.handlers:
+                o.tick()
+            next_tick += self.TICK_INTERVAL
+            delay = next_tick - monotonic()
+            if delay > 0:
+                sleep(delay)
+            else:
+                next_tick = monotonic()
 
 
 class Client(metaclass=ABCMeta):
@@ -385,13 +798,15 @@ class Client(metaclass=ABCMeta):
         self.server_address = (address, port)
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        size_receive_buffer(self.sock)
         self.sock.connect(self.server_address)
+        tune_socket(self.sock)
 
         self.listen_thread = threading.Thread(target=self.listen, daemon=True)
         self.listen_thread.start()
 
     def send(self, pack: Packet) -> None:
-        self.sock.sendall(pack.serialize_with_length())
+        pack.send_on(self.sock)
 
     @abstractmethod
     def packet_callback(self, packet: Packet):
@@ -399,13 +814,15 @@ class Client(metaclass=ABCMeta):
 
     def listen(self):
         """Listens for game state updates from the server and updates the client's local state."""
+        reader = PacketReader()
         while True:
             try:
-                packet = Packet.from_socket(self.sock)
-                if packet is None:
+                packets = reader.recv(self.sock)
+                if packets is None:
                     logger.warning(f"Received empty packet, disconnecting...")
                     break
-                self.packet_callback(packet)
+                for packet in packets:
+                    self.packet_callback(packet)
 
             except (ConnectionError, socket.error) as e:
                 logger.warning(f"Connection error: {e}")
@@ -429,6 +846,20 @@ class Client(metaclass=ABCMeta):
             self.sock.close()
 
 
-def do_if(pack: Packet, t: PacketType, callback: Callable[[], None]) -> None:
-    if pack.packet_type == t:
-        callback()
+class PacketRouter:
+    """Dispatches packets to a single callback per packet type with one dict lookup."""
+
+    def __init__(self) -> None:
+        self.table: Dict[PacketType, Callable[[Packet], None]] = {}
+
+    def on(self, t: PacketType, callback: Callable[[Packet], None]) -> Self:
+        self.table[t] = callback
+        return self
+
+    def dispatch(self, pack: Packet) -> bool:
+        """Runs the callback registered for the packet's type. Returns False if there is none."""
+        callback = self.table.get(pack.packet_type)
+        if callback is None:
+            return False
+        callback(pack)
+        return True
@@ -1,5 +1,6 @@
 from enum import Enum
-import threading, queue, time, bisect, asyncio, math, uuid, json, os, random
+import threading, queue, time, bisect, heapq, asyncio, math, uuid, json, os, random
+import weakref
 from typing import (
     Any,
     Callable,
@@ -7,11 +8,14 @@ from typing import (
     Optional,
     List,
     Generic,
+    Hashable,
     Self,
     Type,
     TypeVar,
     Iterator,
+    Sequence,
     Set,
+    Tuple,
     Union,
     overload,
 )
@@ -19,32 +23,59 @@ from collections import deque, defaultdict
 from dataclasses import dataclass, field
 from functools import total_ordering
 from util import logger
-import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-@dataclass
+
+def _dumps_line(record: Dict[str, Any]) -> bytes:
+    """Encodes a persistence record as one JSON line, using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                record, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+            )
+        except TypeError:
+            pass
+    return (json.dumps(record, separators=(",", ":")) + "\n").encode()
+
+
+def _new_correlation_id() -> str:
+    """
+    A random 128-bit id as 32 hex digits. Same entropy as str(uuid.uuid4())
+    without building a UUID object, and still parseable by uuid.UUID().
+    """
+    return os.urandom(16).hex()
+
+
+@dataclass(slots=True)
 class StateData:
     id: str = field()  # uuid4()
     state: Optional[Any] = field(default=None)
-    last_update: float = field(
-        default_factory=lambda: datetime.datetime.now().timestamp()
-    )
+    # time.time() is the same value as datetime.now().timestamp() without
+    # building a datetime for every state update.
+    last_update: float = field(default_factory=time.time)
 
 
 class EventType(Enum):
     UPDATE_STATE = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class Event:
     event_type: EventType
 
 
 T = TypeVar("T")
 
+# Shared default for read-only lookups, so a miss doesn't allocate a new list.
+_EMPTY: tuple = ()
+
 
 @total_ordering
-@dataclass(order=False)
+@dataclass(order=False, slots=True)
 class Frame(Generic[T]):
     data: T = field(compare=False)
 
@@ -63,31 +94,29 @@ class Frame(Generic[T]):
     topic: Optional[str] = field(default=None, compare=False)
     is_response: bool = field(default=False, compare=False)
 
-    def __eq__(self, other: object) -> bool:
-        if not isinstance(other, Frame):
-            return NotImplemented
-        return (
+    # (available_at, priority, id), built once so comparisons don't rebuild it.
+    _sort_key: tuple = field(default=(), init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.update_sort_key()
+
+    def update_sort_key(self) -> None:
+        """Rebuilds the cached sort key; call after changing its fields."""
+        self._sort_key = (
             self._safe(self.available_at),
             self._safe(self.priority),
             self._safe(self.id),
-        ) == (
-            self._safe(other.available_at),
-            self._safe(other.priority),
-            self._safe(other.id),
         )
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Frame):
+            return NotImplemented
+        return self._sort_key == other._sort_key
+
     def __lt__(self, other: "Frame[T]") -> bool:
         if not isinstance(other, Frame):
             return NotImplemented
-        return (
-            self._safe(self.available_at),
-            self._safe(self.priority),
-            self._safe(self.id),
-        ) < (
-            self._safe(other.available_at),
-            self._safe(other.priority),
-            self._safe(other.id),
-        )
+        return self._sort_key < other._sort_key
 
     @staticmethod
     def _safe(v: Optional[Union[int, float]]) -> Union[int, float]:
@@ -98,6 +127,125 @@ class Frame(Generic[T]):
         return v if v is not None else float("-inf")
 
 
+@dataclass(slots=True)
+class _ConsumerState:
+    """
+    The per-consumer values send() and receive() touch for every frame, kept
+    together so the hot paths do one dict lookup per consumer. The public
+    per-attribute dicts on FramePipeline are kept in sync by the registration
+    and config methods.
+    """
+
+    queue: Union[List[Frame[Any]], deque]
+    info: Dict[str, Any]
+    metrics: Dict[str, Union[int, float]]
+    cond: threading.Condition
+    filter_fn: Optional[Callable[[Frame[Any]], bool]] = None
+    validator: Optional[Callable[[Frame[Any]], bool]] = None
+    maxsize: Optional[int] = None
+    overflow_policy: str = "drop"
+    paused: bool = False
+    # Rate limit as an integer nanosecond interval (0 = unlimited), compared
+    # against the monotonic_ns() stamp in last_receive.
+    min_interval_ns: int = 0
+    last_receive: int = 0
+    # Min-heap of (expire_at, frame id, frame) for queued frames with a TTL, so
+    # purges can tell from the head whether anything is due. Entries for frames
+    # already received are simply discarded once they come due.
+    expiry: List[Tuple[float, int, Frame[Any]]] = field(default_factory=list)
+
+
+class _Scheduler:
+    """
+    Runs periodic tasks on a single daemon thread, sleeping until the earliest
+    one is due. A task's next run is scheduled interval seconds after its
+    current run finishes.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: List[tuple[float, int, float, Callable[[], None]]] = []
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._seq = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def every(self, interval: float, fn: Callable[[], None]) -> None:
+        with self._cond:
+            self._seq += 1
+            heapq.heappush(
+                self._tasks, (time.monotonic() + interval, self._seq, interval, fn)
+            )
+            self._cond.notify()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._thread.join(timeout=timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopped and (
+                    not self._tasks or self._tasks[0][0] > time.monotonic()
+                ):
+                    self._cond.wait(
+                        self._tasks[0][0] - time.monotonic() if self._tasks else None
+                    )
+                if self._stopped:
+                    return
+                _, seq, interval, fn = heapq.heappop(self._tasks)
+            try:
+                fn()
+            except Exception as e:
+                logger.error(f"Error in scheduled task: {e}")
+            with self._cond:
+                heapq.heappush(
+                    self._tasks, (time.monotonic() + interval, seq, interval, fn)
+                )
+
+
+class _RingBuffer(Generic[T]):
+    """
+    Bounded FIFO backing the pipeline's main queue. While there is room, push is
+    a single deque append (atomic under the GIL) with no lock; the lock and
+    condition are only used once the buffer is full. Concurrent producers can
+    overshoot maxsize by at most one item each.
+    """
+
+    def __init__(self, maxsize: Optional[int]) -> None:
+        self.maxsize = maxsize if maxsize is not None and maxsize > 0 else None
+        self._items: deque[T] = deque()
+        self._not_full = threading.Condition(threading.Lock())
+        if self.maxsize is None:
+            # Unbounded: push never waits, so skip the capacity check entirely.
+            self.push = self._push_unbounded  # type: ignore[method-assign]
+
+    def _push_unbounded(self, item: T, timeout: Optional[float] = None) -> None:
+        self._items.append(item)
+
+    def push(self, item: T, timeout: Optional[float] = None) -> None:
+        """Appends item, waiting up to timeout for room; raises queue.Full if none frees up."""
+        if len(self._items) < self.maxsize:
+            self._items.append(item)
+            return
+        with self._not_full:
+            if not self._not_full.wait_for(
+                lambda: len(self._items) < self.maxsize, timeout
+            ):
+                raise queue.Full
+            self._items.append(item)
+
+    def size(self) -> int:
+        return len(self._items)
+
+    def clear(self) -> None:
+        with self._not_full:
+            self._items.clear()
+            self._not_full.notify_all()
+
+
 class FramePipeline(Generic[T]):
     """ """
 
@@ -122,6 +270,7 @@ class FramePipeline(Generic[T]):
         cluster_mode: bool = False,
         deduplication_window: float = 60.0,
         delivery_timeout: float = 5.0,
+        dead_letter_capacity: Optional[int] = None,
     ) -> None:
 
         self.name = name
@@ -131,18 +280,27 @@ class FramePipeline(Generic[T]):
         self.enable_delayed_delivery = enable_delayed_delivery
         self.sorted_queues = self.use_priority or self.enable_delayed_delivery
 
-        self.queue: queue.Queue[Frame[T]] = queue.Queue(maxsize=maxsize)
+        self._ring: _RingBuffer[Frame[T]] = _RingBuffer(maxsize)
         self.lock = threading.Lock()
         self.condition = threading.Condition(self.lock)
         self.closed: bool = False
+        # Set by close() so background loops can stop sleeping immediately.
+        self._closed_event = threading.Event()
+        # Set whenever a frame is queued while listeners are attached, so the
+        # listeners loop sleeps until there is work instead of polling.
+        self._listener_wake = threading.Event()
         self.frame_counter: int = 0
         self.sender_id: Optional[str] = None
 
         if self.sorted_queues:
-            self.consumers: Dict[str, List[Frame[T]]] = {}
+            # Per-consumer heapq min-heaps of (sort_key, frame) entries, where
+            # sort_key is the frame's (available_at, priority, id). Sifting then
+            # compares plain tuples in C instead of calling Frame.__lt__.
+            self.consumers: Dict[str, List[Tuple[tuple, Frame[T]]]] = {}
         else:
             self.consumers: Dict[str, deque] = {}
 
+        self._consumer_state: Dict[str, _ConsumerState] = {}
         self.consumer_filters: Dict[str, Optional[Callable[[Frame[T]], bool]]] = {}
         self.consumer_status: Dict[str, bool] = {}  # True means paused.
         self.consumer_maxsize: Dict[str, Optional[int]] = {}
@@ -150,7 +308,6 @@ class FramePipeline(Generic[T]):
             {}
         )  # "drop", "error", or "block"
         self.consumer_rate_limits: Dict[str, float] = {}
-        self.consumer_last_receive: Dict[str, float] = {}
 
         self.metrics: Dict[str, int] = {
             "frames_sent": 0,
@@ -162,10 +319,26 @@ class FramePipeline(Generic[T]):
             "delivery_timeouts": 0,
         }
         self.consumer_metrics: Dict[str, Dict[str, Union[int, float]]] = {}
-
-        self.delivered_frames: Dict[int, Set[str]] = {}
-        self.acknowledgments: Dict[int, Set[str]] = {}
-        self.delivery_times: Dict[int, float] = {}
+        # (monotonic render time, payload) for the /metrics endpoint.
+        self._metrics_cache: Optional[tuple[float, bytes]] = None
+        self.metrics_cache_ttl: float = 1.0
+
+        # Delivered/acknowledged consumers per frame, as bitmasks over the
+        # consumers' bit indices (see _consumer_index).
+        self.delivered_frames: Dict[int, int] = {}
+        self.acknowledgments: Dict[int, int] = {}
+        # Fully acknowledged frame ids awaiting acknowledged_callbacks, which
+        # run outside the lock (only filled while callbacks are registered).
+        self._acked_pending: deque[int] = deque()
+        self._consumer_index: Dict[str, int] = {}
+        self._consumer_by_index: Dict[int, str] = {}
+        self._free_consumer_indices: List[int] = []
+        # Copy-on-write view of every registered consumer id and their combined
+        # bitmask, replaced whole on (un)registration so untargeted sends reuse
+        # it instead of rebuilding the list and mask per frame.
+        self._consumer_snapshot: Tuple[Tuple[str, ...], int] = ((), 0)
+        # (monotonic delivery time, frame id) min-heap scanned by the ack monitor.
+        self._delivery_heap: List[tuple[int, int]] = []
         self.acknowledged_callbacks: List[Callable[[Frame[T]], None]] = []
 
         self.on_consumer_register: List[Callable[[str], None]] = []
@@ -179,25 +352,25 @@ class FramePipeline(Generic[T]):
         self.sent_callbacks: List[Callable[[Frame[T]], None]] = []
         self.received_callbacks: List[Callable[[Frame[T]], None]] = []
 
+        # Purging, ack timeouts, config reloads and persistence flushes all run
+        # on this one thread.
+        self._scheduler = _Scheduler()
+
         self.auto_purge_interval = auto_purge_interval
-        self._auto_purge_thread: Optional[threading.Thread] = None
         if self.auto_purge_interval is not None:
-            self._auto_purge_thread = threading.Thread(
-                target=self._auto_purge_loop, daemon=True
-            )
-            self._auto_purge_thread.start()
+            self._scheduler.every(self.auto_purge_interval, self.purge_expired_frames)
 
         self.ack_timeout = ack_timeout
         self.max_retries = max_retries
         self.delivery_timeout = delivery_timeout
         self.delivery_timeout_callback: Optional[Callable[[Any, str], None]] = None
-        self._ack_monitor_thread = threading.Thread(
-            target=self._ack_monitor_loop, daemon=True
-        )
-        self._ack_monitor_thread.start()
+        self._scheduler.every(0.5, self._check_ack_timeouts)
 
-        self.global_rate_limit: Optional[float] = global_rate_limit
-        self.last_send_time: float = 0.0
+        self.global_rate_limit = global_rate_limit
+        self._last_send_ns: int = 0
+        # Serialises global rate-limit pacing, so senders sleep without
+        # holding the pipeline lock.
+        self._rate_lock = threading.Lock()
 
         self.scheduled_tasks: List[threading.Timer] = []
 
@@ -219,7 +392,9 @@ class FramePipeline(Generic[T]):
         self.pre_send_callbacks: List[Callable[[Frame[T]], Frame[T]]] = []
         self.pre_delivery_callbacks: List[Callable[[Frame[T], str], None]] = []
 
-        self.dead_letter_queue: deque[Frame[T]] = deque()
+        # deque append/popleft are atomic, so the dead-letter queue needs no
+        # lock. With a capacity set, the oldest frames are discarded on overflow.
+        self.dead_letter_queue: deque[Frame[T]] = deque(maxlen=dead_letter_capacity)
 
         self.distributed_forwarder = distributed_forwarder
         self.backpressure_callback = backpressure_callback
@@ -229,22 +404,28 @@ class FramePipeline(Generic[T]):
         )  # keys: "topic", "group", "access_token", "weight"
         self.consumer_groups: Dict[str, List[str]] = defaultdict(list)
         self.group_rr_index: Dict[str, int] = {}
+        # group -> (members, cumulative weights, total weight)
+        self._group_cum_weights: Dict[
+            str, Tuple[Tuple[str, ...], List[int], int]
+        ] = {}
         self.consumer_validators: Dict[str, Optional[Callable[[Frame[T]], bool]]] = {}
 
         self.persist_file = persist_file
         if self.persist_file:
             self.persistence_lock = threading.Lock()
-            self.persist_file_handle = open(self.persist_file, "a", buffering=1)
+            # Records collect in _persist_buf and are written out in batches by
+            # _persist_flush, so send() never pays for a write syscall.
+            self.persist_file_handle = open(self.persist_file, "ab", buffering=0)
+            self._persist_buf = bytearray()
+            self.persist_flush_interval = 0.01
+            self._scheduler.every(self.persist_flush_interval, self._persist_flush)
         else:
             self.persist_file_handle = None
 
         self.config_file = config_file
         if self.config_file:
             self._config_last_modified = os.path.getmtime(self.config_file)
-            self._config_thread = threading.Thread(
-                target=self._config_reload_loop, daemon=True
-            )
-            self._config_thread.start()
+            self._scheduler.every(2, self._check_config)
 
         self.load_shedding_threshold = load_shedding_threshold
 
@@ -259,13 +440,24 @@ class FramePipeline(Generic[T]):
         self.deserialize_plugins: List[Callable[[Dict[str, Any]], Frame[T]]] = []
 
         self.deduplication_window = deduplication_window
-        self.dedup_cache: Dict[str, float] = {}
+        # Keyed by the 128-bit integer value of UUID correlation ids so probes
+        # hash an int instead of a 36-char string; non-UUID ids stay strings.
+        # Values are time.monotonic() insertion stamps.
+        self.dedup_cache: Dict[Union[int, str], float] = {}
+        self._dedup_order: deque[tuple[float, Union[int, str]]] = deque()
 
         self.listeners: List[FrameListener] = []
-        self._listeners_thread = threading.Thread(
-            target=self._listeners_loop, daemon=True
-        )
-        self._listeners_thread.start()
+        # Called on the sender's thread for every frame sent; see attach_inline().
+        self._inline_callbacks: List[Callable[[Frame[T]], None]] = []
+        # key_fn -> {key: callbacks} for attach_by_key(). Replaced whole on
+        # attach, so send() can iterate it without the lock.
+        self._routes: Dict[
+            Callable[[Frame[T]], Hashable],
+            Dict[Hashable, Tuple[Callable[[Frame[T]], None], ...]],
+        ] = {}
+        # Started by the first attach(), so pipelines without listeners don't
+        # carry an idle thread.
+        self._listeners_thread: Optional[threading.Thread] = None
 
     def circuit_break_hook_warn(self, consumer_id: str) -> None:
         logger.warning(
@@ -318,119 +510,157 @@ class FramePipeline(Generic[T]):
                 raise TypeError(
                     "attach() accepts a FrameListener instance, a FrameListener subclass, or a callable."
                 )
+            with self.lock:
+                if self._listeners_thread is None:
+                    self._listeners_thread = threading.Thread(
+                        target=self._listeners_loop, daemon=True
+                    )
+                    self._listeners_thread.start()
 
-    def _listeners_loop(self) -> None:
-        while not self.closed:
-            [listener.tick() for listener in self.listeners]
-            time.sleep(0.1)
-
-    def _auto_purge_loop(self) -> None:
+    def attach_inline(self, callback: Callable[[Frame[T]], None]) -> None:
         """
-        Runs in a background thread to periodically purge expired frames from all consumer queues.
+        Calls callback with every frame sent, directly on the sending thread.
+        Unlike attach(), no consumer queue or listeners thread is involved, which
+        suits pass-through handlers that only forward or store what they see.
+        Frames are passed as sent, after any pre-send hooks and encryption.
+        """
+        self._inline_callbacks.append(callback)
+        logger.info("Attached inline callback to: %s", self.name)
 
-        The loop sleeps for self.auto_purge_interval seconds between purges. After each interval,
-        it calls the purge_expired_frames() method to remove any frames whose expiration time
-        has passed. The loop terminates when the pipeline is closed.
+    def attach_by_key(
+        self,
+        key_fn: Callable[[Frame[T]], Hashable],
+        key: Hashable,
+        callback: Callable[[Frame[T]], None],
+    ) -> None:
         """
-        while not self.closed:
-            time.sleep(
-                self.auto_purge_interval if self.auto_purge_interval is not None else 1
-            )
-            self.purge_expired_frames()
+        Like attach_inline(), but callback only sees frames for which
+        key_fn(frame) == key. Each key_fn runs once per frame and its result
+        picks the callbacks with a dict lookup, so many keyed callbacks cost no
+        more per frame than one. Callbacks sharing a route should pass the
+        same key_fn object.
+        """
+        with self.lock:
+            routes = dict(self._routes)
+            table = dict(routes.get(key_fn, {}))
+            table[key] = table.get(key, ()) + (callback,)
+            routes[key_fn] = table
+            self._routes = routes
+        logger.info("Attached keyed callback to: %s", self.name)
 
-    def _apply_global_rate_limit(self) -> None:
-        if self.global_rate_limit is not None:
-            min_interval = 1.0 / self.global_rate_limit
-            now = time.time()
-            elapsed = now - self.last_send_time
-            if elapsed < min_interval:
-                time.sleep(min_interval - elapsed)
-            self.last_send_time = time.time()
+    def _listeners_loop(self) -> None:
+        listeners = self.listeners
+        wake = self._listener_wake
+        while not self.closed:
+            # The timeout only covers frames that become available without a
+            # send, such as delayed deliveries.
+            wake.wait(1.0)
+            wake.clear()
+            for listener in listeners:
+                try:
+                    listener.tick()
+                except Exception as e:
+                    logger.error(f"Error in listener tick: {e}")
 
-    def _run_send_interceptors(self, frame_obj: Frame[T]) -> Frame[T]:
+    @staticmethod
+    def _min_interval_ns(rate_limit: Optional[float]) -> int:
         """
-        Runs each interceptor function registered in self.send_interceptors on the frame.
-        Each interceptor should accept a Frame[T] and return a (possibly modified) Frame[T].
-        Any exceptions are caught and logged.
+        Converts a frames-per-second limit to the nanosecond interval cached on
+        the consumer (or pipeline), so the hot paths never divide.
         """
-        for interceptor in self.send_interceptors:
-            try:
-                frame_obj = interceptor(frame_obj)
-            except Exception as e:
-                logger.error(f"Error in send interceptor: {e}")
-        return frame_obj
-
-    def _ack_monitor_loop(self) -> None:
+        if rate_limit is None or rate_limit == float("inf"):
+            return 0
+        if rate_limit <= 0:
+            raise ValueError("rate_limit must be positive")
+        return int(1e9 / rate_limit)
+
+    @property
+    def global_rate_limit(self) -> Optional[float]:
+        return self._global_rate_limit
+
+    @global_rate_limit.setter
+    def global_rate_limit(self, value: Optional[float]) -> None:
+        self._global_min_interval_ns = self._min_interval_ns(value)
+        self._global_rate_limit = value
+
+    def _apply_global_rate_limit(self, count: int = 1) -> None:
         """
-        Monitor delivered frames that have not been acknowledged within ack_timeout.
+        Waits out the global rate limit before sending count frames. Must be
+        called without self.condition held. A batch waits once and books its
+        remaining frames' intervals against the next send.
+        """
+        min_interval = self._global_min_interval_ns
+        if min_interval:
+            with self._rate_lock:
+                elapsed = time.monotonic_ns() - self._last_send_ns
+                if elapsed < min_interval:
+                    time.sleep((min_interval - elapsed) / 1e9)
+                self._last_send_ns = time.monotonic_ns() + (count - 1) * min_interval
+
+    def _check_ack_timeouts(self) -> None:
+        """
+        Checks delivered frames that have not been acknowledged within ack_timeout.
         If the delivery time exceeds ack_timeout, for each consumer that has not
         acknowledged the frame, increment its failure count and (if delivery_timeout
         is exceeded) trigger a delivery timeout callback. Also, if a consumer's failure
         count exceeds the circuit breaker threshold, the consumer is paused.
         """
-        while not self.closed:
-            with self.condition:
-                now = time.time()
-                for frame_id in list(self.delivery_times.keys()):
-                    delivery_time = self.delivery_times[frame_id]
+        now = time.monotonic_ns()
+        ack_timeout = int(self.ack_timeout * 1e9) if self.ack_timeout is not None else 0
+        heap = self._delivery_heap
+        # Nothing is due yet: skip taking the pipeline lock. A racing push can only
+        # add a later deadline, so peeking at the head without the lock is safe.
+        if not heap or now - heap[0][0] < ack_timeout:
+            return
+        with self.condition:
+            delivery_timeout = int(self.delivery_timeout * 1e9)
+            # Oldest delivery first, so stop at the first one still in time.
+            while heap and now - heap[0][0] >= ack_timeout:
+                delivery_time, frame_id = heapq.heappop(heap)
+                if frame_id not in self.delivered_frames:
+                    continue
+                unacked = self.delivered_frames[frame_id] & ~self.acknowledgments.get(
+                    frame_id, 0
+                )
+                for consumer_id in self._consumers_in(unacked):
+                    self.metrics["frames_retried"] += 1
+                    logger.info(
+                        f"{self.name} Retrying frame {frame_id} for consumer {consumer_id}"
+                    )
+                    self.consumer_failures[consumer_id] = (
+                        self.consumer_failures.get(consumer_id, 0) + 1
+                    )
+                    if now - delivery_time >= delivery_timeout:
+                        self.metrics["delivery_timeouts"] += 1
+                        if self.delivery_timeout_callback:
+                            try:
+                                self.delivery_timeout_callback(frame_id, consumer_id)
+                            except Exception as e:
+                                logger.error(f"Delivery timeout callback error: {e}")
                     if (
-                        now - delivery_time >= self.ack_timeout
-                        if self.ack_timeout is not None
-                        else 5
+                        self.consumer_failures[consumer_id]
+                        >= self.circuit_breaker_threshold
                     ):
-                        if frame_id not in self.delivered_frames:
-                            continue
-                        target_consumers = self.delivered_frames[frame_id]
-                        acked = self.acknowledgments.get(frame_id, set())
-                        for consumer_id in target_consumers - acked:
-                            self.metrics["frames_retried"] += 1
-                            logger.info(
-                                f"{self.name} Retrying frame {frame_id} for consumer {consumer_id}"
-                            )
-                            self.consumer_failures[consumer_id] = (
-                                self.consumer_failures.get(consumer_id, 0) + 1
-                            )
-                            if now - delivery_time >= self.delivery_timeout:
-                                self.metrics["delivery_timeouts"] += 1
-                                if self.delivery_timeout_callback:
-                                    try:
-                                        self.delivery_timeout_callback(
-                                            frame_id, consumer_id
-                                        )
-                                    except Exception as e:
-                                        logger.error(
-                                            f"Delivery timeout callback error: {e}"
-                                        )
-                            if (
-                                self.consumer_failures[consumer_id]
-                                >= self.circuit_breaker_threshold
-                            ):
-                                self.pause_consumer(consumer_id)
-                                for hook in self.on_consumer_circuit_break:
-                                    try:
-                                        hook(consumer_id)
-                                    except Exception as e:
-                                        logger.error(
-                                            f"Error in circuit breaker hook: {e}"
-                                        )
-                        del self.delivery_times[frame_id]
-            time.sleep(0.5)
+                        self.pause_consumer(consumer_id)
+                        for hook in self.on_consumer_circuit_break:
+                            try:
+                                hook(consumer_id)
+                            except Exception as e:
+                                logger.error(f"Error in circuit breaker hook: {e}")
 
     def broadcast(self, frame: Frame[T]) -> None:
         logger.info(f"Broadcasting frame {frame.id} in cluster mode (stub).")
 
-    def _config_reload_loop(self) -> None:
-        while not self.closed:
-            try:
-                current = os.path.getmtime(
-                    self.config_file if self.config_file else "./config"
-                )
-                if current != self._config_last_modified:
-                    self._config_last_modified = current
-                    self._reload_config()
-            except Exception as e:
-                logger.error(f"Config reload error: {e}")
-            time.sleep(2)
+    def _check_config(self) -> None:
+        try:
+            current = os.path.getmtime(
+                self.config_file if self.config_file else "./config"
+            )
+            if current != self._config_last_modified:
+                self._config_last_modified = current
+                self._reload_config()
+        except Exception as e:
+            logger.error(f"Config reload error: {e}")
 
     def _reload_config(self) -> None:
         try:
@@ -455,7 +685,7 @@ class FramePipeline(Generic[T]):
         timeout: Optional[float] = 5.0,
         **kwargs,
     ) -> Optional[Frame[T]]:
-        correlation_id = str(uuid.uuid4())
+        correlation_id = _new_correlation_id()
         kwargs["correlation_id"] = correlation_id
         event = threading.Event()
         self.pending_requests[correlation_id] = event
@@ -473,14 +703,6 @@ class FramePipeline(Generic[T]):
             self.request_responses[frame.correlation_id] = frame
             self.pending_requests[frame.correlation_id].set()
 
-    def _run_enrich_plugins(self, frame_obj: Frame[T]) -> Frame[T]:
-        for plugin in self.enrich_plugins:
-            try:
-                frame_obj = plugin(frame_obj)
-            except Exception as e:
-                logger.error(f"Error in enrichment plugin: {e}")
-        return frame_obj
-
     def _run_serialize_plugins(self, frame_obj: Frame[T]) -> Dict[str, Any]:
         record = {
             "id": frame_obj.id,
@@ -526,42 +748,92 @@ class FramePipeline(Generic[T]):
     def _persist_frame(self, frame_obj: Frame[T]) -> None:
         if self.persist_file_handle:
             try:
+                record = self._run_serialize_plugins(frame_obj)
+                line = _dumps_line(record)
                 with self.persistence_lock:
-                    record = self._run_serialize_plugins(frame_obj)
-                    self.persist_file_handle.write(json.dumps(record) + "\n")
+                    self._persist_buf += line
             except Exception as e:
                 logger.error(f"Persistence error: {e}")
 
+    def _flush_persist_buffer(self) -> None:
+        """Writes out buffered records. Must be called with persistence_lock held."""
+        if self._persist_buf and not self.persist_file_handle.closed:
+            self.persist_file_handle.write(self._persist_buf)
+            self._persist_buf.clear()
+
+    def _persist_flush(self) -> None:
+        try:
+            with self.persistence_lock:
+                self._flush_persist_buffer()
+        except Exception as e:
+            logger.error(f"Persistence error: {e}")
+
     def _should_shed(self, frame_obj: Frame[T]) -> bool:
         if self.load_shedding_threshold is not None:
             if (
-                self.queue.qsize() > self.load_shedding_threshold
+                self._ring.size() > self.load_shedding_threshold
                 and frame_obj.priority > 5
             ):
                 return True
         return False
 
-    def _check_dedup(self, correlation_id: str) -> bool:
-        now = time.time()
-        if correlation_id in self.dedup_cache:
-            if now - self.dedup_cache[correlation_id] < self.deduplication_window:
-                return True
-        self.dedup_cache[correlation_id] = now
-        keys_to_delete = [
-            cid
-            for cid, tstamp in self.dedup_cache.items()
-            if now - tstamp >= self.deduplication_window
-        ]
-        for cid in keys_to_delete:
-            del self.dedup_cache[cid]
+    @staticmethod
+    def _dedup_key(correlation_id: str) -> Union[int, str]:
+        try:
+            return uuid.UUID(correlation_id).int
+        except ValueError:
+            return correlation_id
+
+    def _check_dedup(self, correlation_id: Union[int, str]) -> bool:
+        """
+        Accepts either a correlation id string or its integer key (the UUID's
+        128-bit value) and records it in dedup_cache.
+        """
+        key = (
+            self._dedup_key(correlation_id)
+            if isinstance(correlation_id, str)
+            else correlation_id
+        )
+        # Monotonic, so a wall-clock jump can't expire or pin every entry.
+        now = time.monotonic()
+        cache = self.dedup_cache
+        order = self._dedup_order
+        # Entries are appended in time order, so expired ones are all at the
+        # front; pruning first means any key still cached is a duplicate.
+        while order and now - order[0][0] >= self.deduplication_window:
+            tstamp, cid = order.popleft()
+            if cache.get(cid) == tstamp:
+                del cache[cid]
+        if key in cache:
+            return True
+        cache[key] = now
+        order.append((now, key))
         return False
 
-    def _run_pre_send_hooks(self, frame_obj: Frame[T]) -> Frame[T]:
+    def _run_send_chain(self, frame_obj: Frame[T]) -> Frame[T]:
+        """
+        Passes the frame through the pre-send hooks, send interceptors and
+        enrich plugins in that order, each returning a (possibly modified)
+        frame. A failing callback is logged and skipped. The frame's sort key
+        is refreshed afterwards, since any of them may change available_at or
+        priority.
+        """
         for hook in self.pre_send_callbacks:
             try:
                 frame_obj = hook(frame_obj)
             except Exception as e:
                 logger.error(f"Error in pre-send hook: {e}")
+        for interceptor in self.send_interceptors:
+            try:
+                frame_obj = interceptor(frame_obj)
+            except Exception as e:
+                logger.error(f"Error in send interceptor: {e}")
+        for plugin in self.enrich_plugins:
+            try:
+                frame_obj = plugin(frame_obj)
+            except Exception as e:
+                logger.error(f"Error in enrichment plugin: {e}")
+        frame_obj.update_sort_key()
         return frame_obj
 
     def send(
@@ -577,162 +849,403 @@ class FramePipeline(Generic[T]):
         topic: Optional[str] = None,
         sender_id: Optional[str] = None,
     ) -> None:
+        if self._global_min_interval_ns:
+            self._apply_global_rate_limit()
         with self.condition:
             if self.closed:
                 raise RuntimeError("Pipeline is closed.")
-            self._apply_global_rate_limit()
-            self.frame_counter += 1
-            now = time.time()
-            avail_at = (
-                now + delay
-                if (delay is not None and self.enable_delayed_delivery)
-                else now
+            frame_obj = self._prepare_frame(
+                frame, metadata, priority, ttl, delay, correlation_id, topic, sender_id
             )
-            if correlation_id is None:
-                correlation_id = str(uuid.uuid4())
-            if self._check_dedup(correlation_id):
-                logger.info(
-                    f"Duplicate frame with correlation_id {correlation_id} detected; dropping."
+        if frame_obj is None or not self._admit_frame(frame_obj, timeout):
+            return
+        with self.condition:
+            target_consumers = self._select_targets_locked(frame_obj, required_by)
+        entries: List[Tuple[Frame[T], List[Tuple[str, _ConsumerState]]]] = []
+        self._collect_pending(frame_obj, target_consumers, metadata, timeout, entries)
+        if entries:
+            self._enqueue_entries(entries, timeout)
+        self._after_send(frame_obj)
+
+    def send_batch(
+        self,
+        frames: Sequence[T],
+        sender_ids: Optional[Sequence[Optional[str]]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        required_by: Optional[List[str]] = None,
+        timeout: Optional[float] = None,
+        topic: Optional[str] = None,
+    ) -> None:
+        """
+        Sends each item of frames as its own frame, as send() would, but takes
+        the pipeline lock a fixed number of times for the whole batch: once to
+        build the frames, once to pick their consumers and once to enqueue
+        them all. sender_ids, if given, is parallel to frames.
+        """
+        if self._global_min_interval_ns:
+            self._apply_global_rate_limit(len(frames))
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("Pipeline is closed.")
+            if sender_ids is None:
+                sender_ids = [None] * len(frames)
+            prepared = [
+                self._prepare_frame(
+                    frame, metadata, None, None, None, None, topic, sender_id
                 )
-                return
-            frame_obj = Frame(
-                data=frame,
-                metadata=metadata,
-                timestamp=now,
-                sender_id=sender_id,
-                id=self.frame_counter,
-                priority=priority if priority is not None else 0,
-                expire_at=(now + ttl) if ttl is not None else None,
-                available_at=avail_at,
-                correlation_id=correlation_id,
-                topic=topic,
+                for frame, sender_id in zip(frames, sender_ids)
+            ]
+        admitted = [
+            f for f in prepared if f is not None and self._admit_frame(f, timeout)
+        ]
+        if not admitted:
+            return
+        with self.condition:
+            targets = [self._select_targets_locked(f, required_by) for f in admitted]
+        entries: List[Tuple[Frame[T], List[Tuple[str, _ConsumerState]]]] = []
+        for frame_obj, target_consumers in zip(admitted, targets):
+            self._collect_pending(
+                frame_obj, target_consumers, metadata, timeout, entries
             )
-            self.metrics["frames_sent"] += 1
-            frame_obj = self._run_pre_send_hooks(frame_obj)
-            frame_obj = self._run_send_interceptors(frame_obj)
-            frame_obj = self._run_enrich_plugins(frame_obj)
-            if self.encrypt_func is not None:
-                try:
-                    frame_obj.data = self.encrypt_func(frame_obj.data)
-                except Exception as e:
-                    logger.error(f"Encryption error: {e}")
-            self._persist_frame(frame_obj)
+        if entries:
+            self._enqueue_entries(entries, timeout)
+        for frame_obj in admitted:
+            self._after_send(frame_obj)
+
+    def _prepare_frame(
+        self,
+        frame: T,
+        metadata: Optional[Dict[str, Any]],
+        priority: Optional[int],
+        ttl: Optional[float],
+        delay: Optional[float],
+        correlation_id: Optional[str],
+        topic: Optional[str],
+        sender_id: Optional[str],
+    ) -> Optional[Frame[T]]:
+        """
+        Builds the Frame for one send and runs it through dedup, the send chain,
+        encryption and persistence. Returns None for a duplicate. Called with
+        self.condition held; the caller has already applied the global rate
+        limit.
+        """
+        self.frame_counter += 1
+        now = time.time()
+        avail_at = (
+            now + delay
+            if (delay is not None and self.enable_delayed_delivery)
+            else now
+        )
+        if correlation_id is None:
+            # A fresh id can't be a duplicate; record its int key directly
+            # (equal to uuid.UUID(correlation_id).int) without a UUID parse.
+            correlation_id = _new_correlation_id()
+            self._check_dedup(int(correlation_id, 16))
+        elif self._check_dedup(correlation_id):
+            logger.info(
+                "Duplicate frame with correlation_id %s detected; dropping.",
+                correlation_id,
+            )
+            return None
+        frame_obj = Frame(
+            data=frame,
+            metadata=metadata,
+            timestamp=now,
+            sender_id=sender_id,
+            id=self.frame_counter,
+            priority=priority if priority is not None else 0,
+            expire_at=(now + ttl) if ttl is not None else None,
+            available_at=avail_at,
+            correlation_id=correlation_id,
+            topic=topic,
+        )
+        self.metrics["frames_sent"] += 1
+        # Most pipelines have no hooks; skip the chain entirely then.
+        if self.pre_send_callbacks or self.send_interceptors or self.enrich_plugins:
+            frame_obj = self._run_send_chain(frame_obj)
+        if self.encrypt_func is not None:
+            try:
+                frame_obj.data = self.encrypt_func(frame_obj.data)
+            except Exception as e:
+                logger.error(f"Encryption error: {e}")
+        self._persist_frame(frame_obj)
+        return frame_obj
+
+    def _admit_frame(self, frame_obj: Frame[T], timeout: Optional[float]) -> bool:
+        """
+        Pushes a prepared frame onto the main queue, unless load shedding drops
+        it. Returns False if the frame was shed.
+        """
         if self._should_shed(frame_obj):
             with self.lock:
                 self.metrics["frames_dropped"] += 1
-            logger.warning(f"Frame {frame_obj.id} shed due to overload.")
-            return
+            logger.warning("Frame %s shed due to overload.", frame_obj.id)
+            return False
         try:
-            self.queue.put(frame_obj, block=True, timeout=timeout)
+            self._ring.push(frame_obj, timeout)
         except queue.Full:
             with self.lock:
                 self.metrics["frames_dropped"] += 1
             logger.warning("Main queue is full. Frame discarded.")
             raise
-        with self.condition:
-            target_consumers: List[str] = []
-            if required_by is not None:
-                target_consumers = required_by
+        return True
+
+    def _select_targets_locked(
+        self, frame_obj: Frame[T], required_by: Optional[List[str]]
+    ) -> Sequence[str]:
+        """
+        Picks the consumers for a frame and records it as delivered to them.
+        Must be called with self.condition held.
+        """
+        target_consumers: Sequence[str]
+        if required_by is not None:
+            target_consumers = required_by
+        else:
+            if frame_obj.topic is not None:
+                non_group = []
+                groups_to_deliver = set()
+                for cid, info in self.consumer_info.items():
+                    if info.get("topic") == frame_obj.topic:
+                        grp = info.get("group")
+                        if grp:
+                            groups_to_deliver.add(grp)
+                        else:
+                            non_group.append(cid)
+                target_consumers = [
+                    self._weighted_round_robin(grp) for grp in groups_to_deliver
+                ]
+                target_consumers.extend(non_group)
             else:
-                if frame_obj.topic is not None:
-                    non_group = []
-                    groups_to_deliver = set()
-                    for cid, info in self.consumer_info.items():
-                        if info.get("topic") == frame_obj.topic:
-                            grp = info.get("group")
-                            if grp:
-                                groups_to_deliver.add(grp)
-                            else:
-                                non_group.append(cid)
-                    for grp in groups_to_deliver:
-                        chosen = self._weighted_round_robin(grp)
-                        target_consumers.append(chosen)
-                    target_consumers.extend(non_group)
-                else:
-                    target_consumers = list(self.consumers.keys())
-            frame_obj.delivered_to = target_consumers.copy()
-            self.delivered_frames[frame_obj.id] = set(target_consumers)
-            self.acknowledgments[frame_obj.id] = set()
-            self.delivery_times[frame_obj.id] = time.time()
+                target_consumers, mask = self._consumer_snapshot
+        frame_obj.delivered_to = list(target_consumers)
+        if required_by is not None or frame_obj.topic is not None:
+            mask = 0
             for consumer_id in target_consumers:
-                info = self.consumer_info.get(consumer_id, {})
-                required_token = info.get("access_token")
-                if required_token is not None:
-                    if not (
-                        metadata and metadata.get("access_token") == required_token
-                    ):
-                        logger.info(
-                            f"Frame {frame_obj.id} not delivered to consumer '{consumer_id}' due to access token mismatch."
-                        )
-                        continue
-                validator = self.consumer_validators.get(consumer_id)
-                if validator and not validator(frame_obj):
+                index = self._consumer_index.get(consumer_id)
+                if index is not None:
+                    mask |= 1 << index
+        self.delivered_frames[frame_obj.id] = mask
+        self.acknowledgments[frame_obj.id] = 0
+        heapq.heappush(self._delivery_heap, (time.monotonic_ns(), frame_obj.id))
+        return target_consumers
+
+    def _collect_pending(
+        self,
+        frame_obj: Frame[T],
+        target_consumers: Sequence[str],
+        metadata: Optional[Dict[str, Any]],
+        timeout: Optional[float],
+        entries: List[Tuple[Frame[T], List[Tuple[str, _ConsumerState]]]],
+    ) -> None:
+        """
+        Appends frame_obj and the target consumers it passes to entries.
+        Per-consumer checks, callbacks and rate-limit waits run without the
+        pipeline lock; a rate-limit wait first flushes entries so earlier
+        consumers aren't held back by the sleep.
+        """
+        pending: List[Tuple[str, _ConsumerState]] = []
+        for consumer_id in target_consumers:
+            st = self._consumer_state.get(consumer_id)
+            if st is None:
+                continue
+            required_token = st.info.get("access_token")
+            if required_token is not None:
+                if not (metadata and metadata.get("access_token") == required_token):
                     logger.info(
-                        f"Frame {frame_obj.id} rejected by validator for consumer '{consumer_id}'."
+                        "Frame %s not delivered to consumer '%s' due to access token"
+                        " mismatch.",
+                        frame_obj.id,
+                        consumer_id,
                     )
                     continue
-                consumer_queue = self.consumers[consumer_id]
-                max_q = self.consumer_maxsize.get(consumer_id)
-                overflow = self.consumer_overflow_policy.get(consumer_id, "drop")
-                now = time.time()
-                last_time = self.consumer_last_receive.get(consumer_id, 0)
-                rate_limit = self.consumer_rate_limits.get(consumer_id, float("inf"))
-                min_interval = 1.0 / rate_limit if rate_limit != float("inf") else 0.0
-                if now - last_time < min_interval:
-                    wait_time = min_interval - (now - last_time)
-                    self.condition.wait(timeout=wait_time)
-                if max_q is not None and len(consumer_queue) >= max_q:
-                    if self.backpressure_callback is not None:
-                        try:
-                            self.backpressure_callback(consumer_id, len(consumer_queue))
-                        except Exception as e:
-                            logger.error(f"Backpressure callback error: {e}")
-                    if overflow == "drop":
-                        self.metrics["frames_dropped"] += 1
-                        self.consumer_metrics[consumer_id]["frames_dropped"] += 1
-                        logger.warning(
-                            f"Frame dropped for consumer '{consumer_id}' due to full queue."
-                        )
-                        continue
-                    elif overflow == "error":
-                        raise RuntimeError(f"Consumer '{consumer_id}' queue is full.")
-                    elif overflow == "block":
-                        remaining = timeout
-                        self.condition.wait(timeout=remaining)
-                if self.sorted_queues:
-                    self._insort_consumer_queue(consumer_queue, frame_obj)
-                else:
-                    consumer_queue.append(frame_obj)
-            for callback in self.sent_callbacks:
+            validator = st.validator
+            if validator and not validator(frame_obj):
+                logger.info(
+                    "Frame %s rejected by validator for consumer '%s'.",
+                    frame_obj.id,
+                    consumer_id,
+                )
+                continue
+            min_interval = st.min_interval_ns
+            if min_interval:
+                elapsed = time.monotonic_ns() - st.last_receive
+                if elapsed < min_interval:
+                    if pending:
+                        entries.append((frame_obj, pending))
+                        pending = []
+                    if entries:
+                        self._enqueue_entries(entries, timeout)
+                        entries.clear()
+                    time.sleep((min_interval - elapsed) / 1e9)
+            pending.append((consumer_id, st))
+        if pending:
+            entries.append((frame_obj, pending))
+
+    def _after_send(self, frame_obj: Frame[T]) -> None:
+        """Runs the inline, keyed and sent callbacks and forwarding for a frame."""
+        if self._inline_callbacks:
+            for callback in self._inline_callbacks:
                 try:
                     callback(frame_obj)
                 except Exception as e:
-                    logger.error(f"Sent callback error: {e}")
-            self.condition.notify_all()
-            if self.distributed_forwarder is not None:
+                    logger.error(f"Inline callback error: {e}")
+        if self._routes:
+            for key_fn, table in self._routes.items():
+                try:
+                    callbacks = table.get(key_fn(frame_obj), _EMPTY)
+                except Exception as e:
+                    logger.error(f"Route key error: {e}")
+                    continue
+                for callback in callbacks:
+                    try:
+                        callback(frame_obj)
+                    except Exception as e:
+                        logger.error(f"Keyed callback error: {e}")
+        if self.sent_callbacks:
+            for callback in self.sent_callbacks:
                 try:
-                    self.distributed_forwarder(frame_obj)
+                    callback(frame_obj)
                 except Exception as e:
-                    logger.error(f"Distributed forwarder error: {e}")
-            if self.cluster_mode:
-                self.broadcast(frame_obj)
+                    logger.error(f"Sent callback error: {e}")
+        if self.distributed_forwarder is not None:
+            try:
+                self.distributed_forwarder(frame_obj)
+            except Exception as e:
+                logger.error(f"Distributed forwarder error: {e}")
+        if self.cluster_mode:
+            self.broadcast(frame_obj)
+
+    def _enqueue_entries(
+        self,
+        entries: List[Tuple[Frame[T], List[Tuple[str, _ConsumerState]]]],
+        timeout: Optional[float],
+    ) -> None:
+        """
+        Enqueues each (frame, pending consumers) entry under one lock
+        acquisition.
+        """
+        with self.condition:
+            for frame_obj, pending in entries:
+                self._enqueue_locked(frame_obj, pending, timeout)
+            if self.listeners and not self._listener_wake.is_set():
+                self._listener_wake.set()
+
+    def _enqueue_locked(
+        self,
+        frame_obj: Frame[T],
+        pending: List[Tuple[str, _ConsumerState]],
+        timeout: Optional[float],
+    ) -> None:
+        """Enqueues frame_obj for each pending consumer; self.condition is held."""
+        for consumer_id, st in pending:
+            if self._consumer_state.get(consumer_id) is not st:
+                continue  # Unregistered while we weren't holding the lock.
+            consumer_queue = st.queue
+            max_q = st.maxsize
+            if max_q is not None and len(consumer_queue) >= max_q:
+                overflow = st.overflow_policy
+                if self.backpressure_callback is not None:
+                    try:
+                        self.backpressure_callback(consumer_id, len(consumer_queue))
+                    except Exception as e:
+                        logger.error(f"Backpressure callback error: {e}")
+                if overflow == "drop":
+                    self.metrics["frames_dropped"] += 1
+                    st.metrics["frames_dropped"] += 1
+                    logger.warning(
+                        "Frame dropped for consumer '%s' due to full queue.",
+                        consumer_id,
+                    )
+                    continue
+                elif overflow == "error":
+                    raise RuntimeError(f"Consumer '{consumer_id}' queue is full.")
+                elif overflow == "block":
+                    # Receivers notify st.cond as they pop, so wait there
+                    # until there's room, the timeout runs out (the frame
+                    # is then queued anyway), or the consumer goes away.
+                    deadline = (
+                        None if timeout is None else time.monotonic() + timeout
+                    )
+                    while len(consumer_queue) >= max_q and not self.closed:
+                        remaining = (
+                            None
+                            if deadline is None
+                            else deadline - time.monotonic()
+                        )
+                        if remaining is not None and remaining <= 0:
+                            break
+                        st.cond.wait(timeout=remaining)
+                        if self._consumer_state.get(consumer_id) is not st:
+                            break
+                    if self._consumer_state.get(consumer_id) is not st:
+                        continue
+            if self.sorted_queues:
+                heapq.heappush(consumer_queue, (frame_obj._sort_key, frame_obj))
+            else:
+                consumer_queue.append(frame_obj)
+            if frame_obj.expire_at is not None:
+                heapq.heappush(
+                    st.expiry, (frame_obj.expire_at, frame_obj.id, frame_obj)
+                )
+            # One frame needs one receiver: wake a single waiter on this
+            # consumer while the lock is already held. Blocked senders
+            # share the condition, so a bounded queue wakes everyone.
+            if max_q is None:
+                st.cond.notify()
+            else:
+                st.cond.notify_all()
 
     def send_nowait(self, *args, **kwargs) -> None:
         self.send(*args, **kwargs)
 
-    def _consumer_queue_pop(self, consumer_id: str) -> Optional[Frame[T]]:
-        if self.sorted_queues:
-            qlist: List[Frame[T]] = self.consumers[consumer_id]
-            if qlist:
-                if qlist[0].available_at > time.time():
-                    return None
-                return qlist.pop(0)
+    def _consumer_queue_pop(
+        self, q: Union[List[Tuple[tuple, Frame[T]]], deque], now: float
+    ) -> Optional[Frame[T]]:
+        """
+        Pops the next available frame from a consumer queue the caller already
+        holds. On a heap the head's availability is read from its cached sort
+        key, which starts with available_at.
+        """
+        if not q:
             return None
-        else:
-            dq: deque = self.consumers[consumer_id]
-            if dq:
-                return dq.popleft()
+        if self.sorted_queues:
+            if q[0][0][0] > now:
+                return None
+            return heapq.heappop(q)[1]
+        return q.popleft()
+
+    def _consumer_queue_pop_batch(
+        self, consumer_id: str, max_n: int, now: float
+    ) -> List[Frame[T]]:
+        """Pops up to max_n frames that are already available."""
+        q = self.consumers[consumer_id]
+        if self.sorted_queues:
+            out: List[Frame[T]] = []
+            while q and len(out) < max_n and q[0][1].available_at <= now:
+                out.append(heapq.heappop(q)[1])
+            return out
+        return [q.popleft() for _ in range(min(max_n, len(q)))]
+
+    def _consumer_queue_replace(
+        self, consumer_id: str, frame_obj: Frame[T]
+    ) -> Optional[Frame[T]]:
+        """
+        Pops the consumer's next frame and queues frame_obj in its place. On a
+        sorted queue this is a single heapreplace sift instead of a pop plus a
+        push. Returns None (and just queues frame_obj) if the queue was empty.
+        """
+        q = self.consumers[consumer_id]
+        if not q:
+            if self.sorted_queues:
+                heapq.heappush(q, (frame_obj._sort_key, frame_obj))
+            else:
+                q.append(frame_obj)
             return None
+        if self.sorted_queues:
+            return heapq.heapreplace(q, (frame_obj._sort_key, frame_obj))[1]
+        head = q.popleft()
+        q.append(frame_obj)
+        return head
 
     def _run_receive_interceptors(self, frame_obj: Frame[T]) -> Frame[T]:
         """
@@ -747,138 +1260,128 @@ class FramePipeline(Generic[T]):
                 logger.error(f"Error in receive interceptor: {e}")
         return frame_obj
 
-    def _insort_consumer_queue(
-        self, queue_list: List[Frame[T]], frame_obj: Frame[T]
-    ) -> None:
-        """
-        Inserts 'frame_obj' into 'queue_list', maintaining the sorted order.
-        The frames are sorted by a tuple key: (available_at, priority, id).
-
-        Parameters:
-            queue_list (List[Frame[T]]): The list of frames (assumed to be already sorted).
-            frame_obj (Frame[T]): The frame to insert.
-        """
-        key = (frame_obj.available_at, frame_obj.priority, frame_obj.id)
-        lo = 0
-        hi = len(queue_list)
-        while lo < hi:
-            mid = (lo + hi) // 2
-            mid_frame = queue_list[mid]
-            mid_key = (mid_frame.available_at, mid_frame.priority, mid_frame.id)
-            if key < mid_key:
-                hi = mid
-            else:
-                lo = mid + 1
-        queue_list.insert(lo, frame_obj)
+    def _drop_if_expired(
+        self, consumer_id: str, frame_obj: Frame[T], now: float
+    ) -> bool:
+        """Counts and reports an expired frame; the caller then discards it."""
+        if frame_obj.expire_at is not None and now > frame_obj.expire_at:
+            self.metrics["frames_expired"] += 1
+            self.consumer_metrics[consumer_id]["frames_expired"] += 1
+            logger.debug(
+                "Expired frame dropped for consumer '%s': %s", consumer_id, frame_obj
+            )
+            return True
+        return False
 
-    def receive(
-        self, consumer_id: str, block: bool = True, timeout: Optional[float] = None
+    def _deliver(
+        self, consumer_id: str, frame_obj: Frame[T], now: float
     ) -> Optional[Frame[T]]:
-        with self.condition:
-            if consumer_id not in self.consumers:
-                self.register_consumer(consumer_id)
-            consumer_queue = self.consumers[consumer_id]
-            start_time = time.monotonic()
-            while True:
-                if self.consumer_status.get(consumer_id, False):
-                    remaining = (
-                        None
-                        if timeout is None
-                        else timeout - (time.monotonic() - start_time)
+        """
+        Runs a popped, available frame through the consumer's filter and
+        metrics. Returns None if the filter rejected it. Must be called with
+        self.condition held; now is the caller's time.time() snapshot for this
+        pass. The caller then releases the lock and runs _finish_delivery().
+        """
+        st = self._consumer_state[consumer_id]
+        filter_fn = st.filter_fn
+        if filter_fn is not None:
+            try:
+                if not filter_fn(frame_obj):
+                    logger.debug(
+                        "Frame %s filtered out for consumer '%s'.",
+                        frame_obj.id,
+                        consumer_id,
                     )
-                    if timeout is not None and remaining is not None and remaining <= 0:
-                        return None
-                    self.condition.wait(timeout=remaining)
-                    continue
-
-                now = time.time()
-                last_time = self.consumer_last_receive.get(consumer_id, 0)
-                rate_limit = self.consumer_rate_limits.get(consumer_id, float("inf"))
-                min_interval = 1.0 / rate_limit if rate_limit != float("inf") else 0.0
-                if now - last_time < min_interval:
-                    wait_time = min_interval - (now - last_time)
-                    self.condition.wait(timeout=wait_time)
-
-                frame_obj = self._consumer_queue_pop(consumer_id)
-                if frame_obj is not None:
-                    if (
-                        frame_obj.expire_at is not None
-                        and time.time() > frame_obj.expire_at
-                    ):
-                        self.metrics["frames_expired"] += 1
-                        self.consumer_metrics[consumer_id]["frames_expired"] += 1
-                        logger.debug(
-                            f"Expired frame dropped for consumer '{consumer_id}': {frame_obj}"
-                        )
-                        continue
+                    return None
+            except Exception as e:
+                logger.error(
+                    f"Error applying filter for consumer '{consumer_id}': {e}"
+                )
+                return None
+
+        self.metrics["frames_received"] += 1
+        metrics = st.metrics
+        metrics["frames_received"] += 1
+        metrics["total_frame_delay"] += max(0.0, now - frame_obj.available_at)
+        metrics["frame_delay_count"] += 1
+        st.last_receive = time.monotonic_ns()
+        # Auto-acknowledge while the lock is already held rather than taking it
+        # again afterwards.
+        self._ack_locked(consumer_id, frame_obj.id)
+        return frame_obj
 
-                    if frame_obj.available_at and frame_obj.available_at > time.time():
-                        wait_time = frame_obj.available_at - time.time()
-                        if not block:
-                            if self.sorted_queues:
-                                self._insort_consumer_queue(consumer_queue, frame_obj)
-                            else:
-                                consumer_queue.appendleft(frame_obj)
-                            return None
-                        else:
-                            self.condition.wait(timeout=wait_time)
-                            continue
+    def _finish_delivery(self, consumer_id: str, frame_obj: Frame[T]) -> Frame[T]:
+        """
+        Runs a delivered frame through the user hooks and decryption, and
+        fires any acknowledged callbacks. Called without self.condition held,
+        so slow callbacks or decrypt_func don't stall senders and other
+        consumers.
+        """
+        pre_delivery = self.pre_delivery_callbacks
+        if pre_delivery:
+            for hook in pre_delivery:
+                try:
+                    hook(frame_obj, consumer_id)
+                except Exception as e:
+                    logger.error(f"Pre-delivery hook error: {e}")
 
-                    filter_fn = self.consumer_filters.get(consumer_id)
-                    if filter_fn is not None:
-                        try:
-                            if not filter_fn(frame_obj):
-                                logger.debug(
-                                    f"Frame {frame_obj.id} filtered out for consumer '{consumer_id}'."
-                                )
-                                continue
-                        except Exception as e:
-                            logger.error(
-                                f"Error applying filter for consumer '{consumer_id}': {e}"
-                            )
-                            continue
-
-                    self.metrics["frames_received"] += 1
-                    self.consumer_metrics[consumer_id]["frames_received"] += 1
-                    delay_time = max(0.0, time.time() - frame_obj.available_at)
-                    self.consumer_metrics[consumer_id][
-                        "total_frame_delay"
-                    ] += delay_time
-                    self.consumer_metrics[consumer_id]["frame_delay_count"] += 1
-                    self.consumer_last_receive[consumer_id] = time.time()
-
-                    for hook in self.pre_delivery_callbacks:
-                        try:
-                            hook(frame_obj, consumer_id)
-                        except Exception as e:
-                            logger.error(f"Pre-delivery hook error: {e}")
+        if self.receive_interceptors:
+            frame_obj = self._run_receive_interceptors(frame_obj)
 
-                    frame_obj = self._run_receive_interceptors(frame_obj)
+        decrypt = self.decrypt_func
+        if decrypt is not None:
+            try:
+                frame_obj.data = decrypt(frame_obj.data)
+            except Exception as e:
+                logger.error(f"Decryption error: {e}")
 
-                    if self.decrypt_func is not None:
-                        try:
-                            frame_obj.data = self.decrypt_func(frame_obj.data)
-                        except Exception as e:
-                            logger.error(f"Decryption error: {e}")
+        if frame_obj.is_response:
+            self.process_response(frame_obj)
 
-                    if frame_obj.is_response:
-                        self.process_response(frame_obj)
+        received = self.received_callbacks
+        if received:
+            for callback in received:
+                try:
+                    callback(frame_obj)
+                except Exception as e:
+                    logger.error(f"Received callback error: {e}")
 
-                    for callback in self.received_callbacks:
-                        try:
-                            callback(frame_obj)
-                        except Exception as e:
-                            logger.error(f"Received callback error: {e}")
+        # Lazy %-args: the frame's dataclass repr is only built if DEBUG is on.
+        logger.debug("Frame received by %s: %s", consumer_id, frame_obj)
 
-                    logger.debug(f"Frame received by {consumer_id}: {frame_obj}")
+        if self._acked_pending:
+            self._run_acknowledged_callbacks()
+        return frame_obj
 
-                    # Acknowledge the frame
-                    self.acknowledge(consumer_id, frame_obj.id)
-                    return frame_obj
+    def _ensure_consumer(self, consumer_id: str) -> None:
+        """Registers consumer_id with default settings if it isn't already."""
+        if consumer_id not in self.consumers:
+            try:
+                self.register_consumer(consumer_id)
+            except ValueError:
+                pass  # Registered concurrently by another thread.
 
-                if not block:
-                    return None
+    def receive(
+        self, consumer_id: str, block: bool = True, timeout: Optional[float] = None
+    ) -> Optional[Frame[T]]:
+        self._ensure_consumer(consumer_id)
+        with self.condition:
+            frame_obj = self._receive_locked(consumer_id, block, timeout)
+        if frame_obj is None:
+            return None
+        return self._finish_delivery(consumer_id, frame_obj)
 
+    def _receive_locked(
+        self, consumer_id: str, block: bool, timeout: Optional[float]
+    ) -> Optional[Frame[T]]:
+        """The body of receive(); must be called with self.condition held."""
+        st = self._consumer_state.get(consumer_id)
+        if st is None:
+            return None  # Unregistered since the caller checked.
+        cond = st.cond
+        start_time = time.monotonic()
+        while True:
+            if st.paused:
                 remaining = (
                     None
                     if timeout is None
@@ -886,19 +1389,136 @@ class FramePipeline(Generic[T]):
                 )
                 if timeout is not None and remaining is not None and remaining <= 0:
                     return None
+                cond.wait(timeout=remaining)
+                continue
+
+            min_interval = st.min_interval_ns
+            if min_interval:
+                elapsed = time.monotonic_ns() - st.last_receive
+                if elapsed < min_interval:
+                    wait_time = (min_interval - elapsed) / 1e9
+                    if wait_time < 0.001:
+                        # Too short to be worth a condition round-trip, and a
+                        # plain sleep can't be cut short by a send's notify.
+                        self.lock.release()
+                        try:
+                            time.sleep(wait_time)
+                        finally:
+                            self.lock.acquire()
+                    else:
+                        cond.wait(timeout=wait_time)
+                    continue  # Re-check pause and pacing after waiting.
+
+            # One clock read per pass; it's re-read after any wait.
+            now = time.time()
+            consumer_queue = st.queue
+            frame_obj = self._consumer_queue_pop(consumer_queue, now)
+            if frame_obj is not None:
+                if st.maxsize is not None:
+                    cond.notify_all()  # Room for a sender blocked on overflow.
+                if self._drop_if_expired(consumer_id, frame_obj, now):
+                    continue
 
-                self.condition.wait(timeout=remaining)
-                if self.closed and not consumer_queue:
-                    return None
+                if frame_obj.available_at and frame_obj.available_at > now:
+                    wait_time = frame_obj.available_at - now
+                    if not block:
+                        if self.sorted_queues:
+                            heapq.heappush(
+                                consumer_queue, (frame_obj._sort_key, frame_obj)
+                            )
+                        else:
+                            consumer_queue.appendleft(frame_obj)
+                        return None
+                    else:
+                        cond.wait(timeout=wait_time)
+                        continue
+
+                delivered = self._deliver(consumer_id, frame_obj, now)
+                if delivered is None:
+                    continue
+                return delivered
+
+            if not block:
+                return None
+
+            remaining = (
+                None
+                if timeout is None
+                else timeout - (time.monotonic() - start_time)
+            )
+            if timeout is not None and remaining is not None and remaining <= 0:
+                return None
+
+            cond.wait(timeout=remaining)
+            if self.closed and not st.queue:
+                return None
+
+    def dequeue_enqueue(
+        self, consumer_id: str, frame_obj: Frame[T]
+    ) -> Optional[Frame[T]]:
+        """
+        Takes the consumer's next frame and queues frame_obj in one step, for
+        listeners that drain and refill the same queue. The returned frame is
+        not acknowledged or run through the receive hooks.
+        """
+        with self.condition:
+            if consumer_id not in self.consumers:
+                raise ValueError(f"Consumer '{consumer_id}' is not registered.")
+            head = self._consumer_queue_replace(consumer_id, frame_obj)
+            st = self._consumer_state[consumer_id]
+            if frame_obj.expire_at is not None:
+                heapq.heappush(
+                    st.expiry, (frame_obj.expire_at, frame_obj.id, frame_obj)
+                )
+            if st.maxsize is None:
+                st.cond.notify()
+            else:
+                st.cond.notify_all()  # Blocked senders wait here too.
+            if self.listeners and not self._listener_wake.is_set():
+                self._listener_wake.set()
+            return head
 
     def batch_receive(self, consumer_id: str, max_frames: int) -> List[Frame[T]]:
-        frames = []
-        for _ in range(max_frames):
-            f = self.receive(consumer_id, block=False)
-            if f is None:
+        """
+        Non-blocking receive of up to max_frames ready frames. The queue is
+        drained under a single acquisition of self.condition rather than one
+        per frame. Rate-limited consumers take frames one at a time, still
+        under that acquisition, so their pacing still applies.
+        """
+        frames: List[Frame[T]] = []
+        self._ensure_consumer(consumer_id)
+        with self.condition:
+            st = self._consumer_state.get(consumer_id)
+            if st is not None and st.min_interval_ns:
+                for _ in range(max_frames):
+                    f = self._receive_locked(consumer_id, False, None)
+                    if f is None:
+                        break
+                    frames.append(f)
+            elif st is not None and not st.paused:
+                self._drain_ready_locked(consumer_id, max_frames, frames)
+        return [self._finish_delivery(consumer_id, f) for f in frames]
+
+    def _drain_ready_locked(
+        self, consumer_id: str, max_frames: int, frames: List[Frame[T]]
+    ) -> None:
+        """Appends up to max_frames delivered frames; self.condition is held."""
+        now = time.time()
+        st = self._consumer_state[consumer_id]
+        while len(frames) < max_frames:
+            popped = self._consumer_queue_pop_batch(
+                consumer_id, max_frames - len(frames), now
+            )
+            if not popped:
                 break
-            frames.append(f)
-        return frames
+            if st.maxsize is not None:
+                st.cond.notify_all()  # Room for senders blocked on overflow.
+            for frame_obj in popped:
+                if self._drop_if_expired(consumer_id, frame_obj, now):
+                    continue
+                delivered = self._deliver(consumer_id, frame_obj, now)
+                if delivered is not None:
+                    frames.append(delivered)
 
     def iterate_frames(
         self, consumer_id: str, timeout: Optional[float] = None
@@ -912,69 +1532,98 @@ class FramePipeline(Generic[T]):
     def purge_expired_frames(self) -> None:
         now = time.time()
         with self.condition:
-            for cid, q in self.consumers.items():
+            # Queues are filtered in place, so _ConsumerState and any receiver
+            # or blocked sender holding a queue keep seeing the live object.
+            for cid, st in self._consumer_state.items():
+                expiry = st.expiry
+                if not expiry or expiry[0][0] >= now:
+                    continue  # Nothing of this consumer's has come due.
+                while expiry and expiry[0][0] < now:
+                    heapq.heappop(expiry)
+                q = st.queue
                 if self.sorted_queues:
-                    new_q = [f for f in q if f.expire_at is None or now <= f.expire_at]
-                    dropped = len(q) - len(new_q)
+                    kept = [
+                        e for e in q if e[1].expire_at is None or now <= e[1].expire_at
+                    ]
+                    dropped = len(q) - len(kept)
                     if dropped > 0:
                         self.metrics["frames_expired"] += dropped
                         self.consumer_metrics[cid]["frames_expired"] += dropped
-                    self.consumers[cid] = new_q
+                        heapq.heapify(kept)
+                        q[:] = kept
                 else:
-                    init = len(q)
-                    remaining = deque()
-                    while q:
+                    # Rotate once through the deque, re-appending keepers.
+                    for _ in range(len(q)):
                         f = q.popleft()
                         if f.expire_at is None or now <= f.expire_at:
-                            remaining.append(f)
+                            q.append(f)
                         else:
                             self.metrics["frames_expired"] += 1
                             self.consumer_metrics[cid]["frames_expired"] += 1
-                    self.consumers[cid] = remaining
+                if st.maxsize is not None:
+                    st.cond.notify_all()
             self.condition.notify_all()
 
     def acknowledge(self, consumer_id: str, frame_id: int) -> None:
-        if True:
-            if frame_id not in self.acknowledgments:
-                logger.warning(f"Frame {frame_id} not found for acknowledgment.")
+        with self.lock:
+            self._ack_locked(consumer_id, frame_id)
+        if self._acked_pending:
+            self._run_acknowledged_callbacks()
+
+    def _ack_locked(self, consumer_id: str, frame_id: int) -> None:
+        """Records consumer_id's acknowledgment; self.lock must be held."""
+        acked = self.acknowledgments.get(frame_id)
+        if acked is None:
+            logger.warning(f"Frame {frame_id} not found for acknowledgment.")
+            return
+        delivered = self.delivered_frames.get(frame_id, 0)
+        index = self._consumer_index.get(consumer_id)
+        if index is not None:
+            # Only consumers the frame went to count towards it.
+            acked |= (1 << index) & delivered
+        if acked != delivered:
+            self.acknowledgments[frame_id] = acked
+            return
+        self._complete_ack_locked(frame_id)
+
+    def _complete_ack_locked(self, frame_id: int) -> None:
+        """Retires a fully acknowledged frame; self.lock must be held."""
+        del self.acknowledgments[frame_id]
+        self.delivered_frames.pop(frame_id, None)
+        if self.acknowledged_callbacks:
+            self._acked_pending.append(frame_id)
+
+    def _run_acknowledged_callbacks(self) -> None:
+        """Fires acknowledged_callbacks for each pending frame id, exactly once."""
+        while True:
+            try:
+                frame_id = self._acked_pending.popleft()
+            except IndexError:
                 return
-            self.acknowledgments[frame_id].add(consumer_id)
-            delivered = self.delivered_frames.get(frame_id, set())
-            if self.acknowledgments[frame_id] == delivered:
-                for callback in self.acknowledged_callbacks:
-                    try:
-                        dummy = Frame(
-                            data=None,
-                            metadata=None,
-                            timestamp=0,
-                            sender_id=None,
-                            id=frame_id,
-                            priority=0,
-                            expire_at=None,
-                            available_at=0,
-                        )
-                        callback(dummy)
-                    except Exception as e:
-                        logger.error(f"Acknowledged callback error: {e}")
-                del self.acknowledgments[frame_id]
-                if frame_id in self.delivered_frames:
-                    del self.delivered_frames[frame_id]
+            # One id-only stand-in per acknowledgement, shared by all callbacks.
+            dummy = Frame(data=None, timestamp=0, id=frame_id, available_at=0)
+            for callback in self.acknowledged_callbacks:
+                try:
+                    callback(dummy)
+                except Exception as e:
+                    logger.error(f"Acknowledged callback error: {e}")
 
     def add_to_dead_letter(self, frame_obj: Frame[T]) -> None:
-        with self.lock:
-            self.dead_letter_queue.append(frame_obj)
-            logger.info(f"Frame {frame_obj.id} moved to dead-letter queue.")
+        self.dead_letter_queue.append(frame_obj)
+        logger.info("Frame %s moved to dead-letter queue.", frame_obj.id)
 
     def get_dead_letter_frames(self) -> List[Frame[T]]:
-        with self.lock:
-            return list(self.dead_letter_queue)
+        # Copying a deque runs entirely in C, so it can't see a concurrent append.
+        return list(self.dead_letter_queue.copy())
 
     def requeue_dead_letter_frames(self) -> None:
-        with self.condition:
-            while self.dead_letter_queue:
-                f = self.dead_letter_queue.popleft()
-                self.queue.put(f)
-            self.condition.notify_all()
+        dlq = self.dead_letter_queue
+        while True:
+            try:
+                f = dlq.popleft()
+            except IndexError:
+                break
+            self._ring.push(f)
 
     def transactional_send(
         self, frames: List[T], metadata: Optional[Dict[str, Any]] = None, **kwargs
@@ -996,7 +1645,7 @@ class FramePipeline(Generic[T]):
                     priority=0,
                     expire_at=None,
                     available_at=time.time(),
-                    correlation_id=str(uuid.uuid4()),
+                    correlation_id=_new_correlation_id(),
                 )
                 self.add_to_dead_letter(dummy)
             raise
@@ -1021,20 +1670,12 @@ class FramePipeline(Generic[T]):
         class MetricsHandler(BaseHTTPRequestHandler):
             def do_GET(self):
                 if self.path == "/metrics":
-                    metrics = pipeline.get_metrics()
-                    lines = []
-                    for k, v in metrics["global"].items():
-                        lines.append(f"pipeline_{k} {v}")
-                    for cid, m in metrics["consumers"].items():
-                        for k, v in m.items():
-                            lines.append(
-                                f'pipeline_consumer{{id="{cid}",metric="{k}"}} {v}'
-                            )
-                    output = "\n".join(lines)
+                    payload = pipeline._render_metrics()
                     self.send_response(200)
                     self.send_header("Content-type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(payload)))
                     self.end_headers()
-                    self.wfile.write(output.encode("utf-8"))
+                    self.wfile.write(payload)
                 else:
                     self.send_error(404)
 
@@ -1043,25 +1684,75 @@ class FramePipeline(Generic[T]):
         t.start()
         logger.info(f"Metrics server started on port {port}.")
 
-    def _weighted_round_robin(self, group: str) -> str:
-        members = self.consumer_groups.get(group, [])
-        if not members:
-            raise ValueError(f"No consumers in group {group}")
-        total_weight = 0
-        weighted_list = []
+    def _render_metrics(self) -> bytes:
+        """
+        Renders the metrics in Prometheus text format. The result is reused for
+        metrics_cache_ttl seconds so rapid scrapes don't keep taking the lock,
+        and it is built straight from the live dicts instead of get_metrics()
+        copies.
+        """
+        cached = self._metrics_cache
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < self.metrics_cache_ttl:
+            return cached[1]
+        with self.lock:
+            lines = [
+                b"pipeline_%s %s" % (k.encode(), str(v).encode())
+                for k, v in self.metrics.items()
+            ]
+            for cid, m in self.consumer_metrics.items():
+                prefix = b'pipeline_consumer{id="%s",metric="' % cid.encode()
+                lines.extend(
+                    b'%s%s"} %s' % (prefix, k.encode(), str(v).encode())
+                    for k, v in m.items()
+                )
+        payload = b"\n".join(lines)
+        self._metrics_cache = (now, payload)
+        return payload
+
+    def _rebuild_consumer_snapshot(self) -> None:
+        """Republishes _consumer_snapshot; called with the lock held."""
+        mask = 0
+        for index in self._consumer_by_index:
+            mask |= 1 << index
+        self._consumer_snapshot = (tuple(self.consumers), mask)
+
+    def _rebuild_group_schedule(self, group: str) -> None:
+        """
+        Precomputes the group's prefix sums of weights, so a weighted
+        round-robin pick is one bisect and memory stays O(members) however
+        large the weights are.
+        """
+        members = tuple(self.consumer_groups.get(group, _EMPTY))
+        cum: List[int] = []
+        total = 0
         for cid in members:
-            weight = self.consumer_info.get(cid, {}).get("weight", 1)
-            total_weight += weight
-            weighted_list.append((cid, weight))
+            # Group members are always registered, so their info exists.
+            total += max(0, self.consumer_info[cid].get("weight", 1))
+            cum.append(total)
+        self._group_cum_weights[group] = (members, cum, total)
+
+    def _consumers_in(self, mask: int) -> List[str]:
+        """Returns the registered consumers whose bits are set in mask."""
+        consumers = []
+        while mask:
+            low = mask & -mask
+            consumer_id = self._consumer_by_index.get(low.bit_length() - 1)
+            if consumer_id is not None:
+                consumers.append(consumer_id)
+            mask ^= low
+        return consumers
+
+    def _weighted_round_robin(self, group: str) -> str:
+        members, cum, total = self._group_cum_weights.get(group, ((), [], 0))
+        if not total:
+            members = self.consumer_groups.get(group, _EMPTY)
+            if not members:
+                raise ValueError(f"No consumers in group {group}")
+            return members[0]
         index = self.group_rr_index.get(group, 0)
-        counter = index % total_weight
-        for cid, weight in weighted_list:
-            if counter < weight:
-                self.group_rr_index[group] = index + 1
-                return cid
-            counter -= weight
         self.group_rr_index[group] = index + 1
-        return members[0]
+        return members[bisect.bisect_right(cum, index % total)]
 
     def register_consumer(
         self,
@@ -1076,6 +1767,7 @@ class FramePipeline(Generic[T]):
         access_token: Optional[str] = None,
         weight: int = 1,
     ) -> None:
+        min_interval_ns = self._min_interval_ns(rate_limit)
         with self.lock:
             if consumer_id in self.consumers:
                 raise ValueError(f"Consumer '{consumer_id}' is already registered.")
@@ -1084,6 +1776,13 @@ class FramePipeline(Generic[T]):
             else:
                 self.consumers[consumer_id] = deque()
             self.consumer_filters[consumer_id] = filter_fn
+            if self._free_consumer_indices:
+                index = heapq.heappop(self._free_consumer_indices)
+            else:
+                index = len(self._consumer_index)
+            self._consumer_index[consumer_id] = index
+            self._consumer_by_index[index] = consumer_id
+            self._rebuild_consumer_snapshot()
             self.consumer_status[consumer_id] = False
             self.consumer_maxsize[consumer_id] = max_queue_size
             if overflow_policy not in ("drop", "error", "block"):
@@ -1092,7 +1791,6 @@ class FramePipeline(Generic[T]):
             self.consumer_rate_limits[consumer_id] = (
                 rate_limit if rate_limit is not None else float("inf")
             )
-            self.consumer_last_receive[consumer_id] = 0.0
             self.consumer_metrics[consumer_id] = {
                 "frames_received": 0,
                 "frames_expired": 0,
@@ -1108,10 +1806,23 @@ class FramePipeline(Generic[T]):
                 "weight": weight,
             }
             self.consumer_validators[consumer_id] = validate_func
+            self._consumer_state[consumer_id] = _ConsumerState(
+                queue=self.consumers[consumer_id],
+                info=self.consumer_info[consumer_id],
+                metrics=self.consumer_metrics[consumer_id],
+                # Shares self.lock, so receivers can wait on just their own consumer.
+                cond=threading.Condition(self.lock),
+                filter_fn=filter_fn,
+                validator=validate_func,
+                maxsize=max_queue_size,
+                overflow_policy=overflow_policy,
+                min_interval_ns=min_interval_ns,
+            )
             if group is not None:
                 self.consumer_groups[group].append(consumer_id)
                 if group not in self.group_rr_index:
                     self.group_rr_index[group] = 0
+                self._rebuild_group_schedule(group)
             logger.info(
                 f"Consumer '{consumer_id}' registered on topic '{topic}' with group '{group}', weight {weight}."
             )
@@ -1125,19 +1836,41 @@ class FramePipeline(Generic[T]):
         with self.lock:
             if consumer_id not in self.consumers:
                 raise ValueError(f"Consumer '{consumer_id}' is not registered.")
-            info = self.consumer_info.get(consumer_id, {})
-            group = info.get("group")
-            if group and consumer_id in self.consumer_groups.get(group, []):
+            group = self.consumer_info[consumer_id].get("group")
+            if group and consumer_id in self.consumer_groups.get(group, _EMPTY):
                 self.consumer_groups[group].remove(consumer_id)
+                self._rebuild_group_schedule(group)
             del self.consumer_info[consumer_id]
             self.consumer_validators.pop(consumer_id, None)
             del self.consumers[consumer_id]
+            self._consumer_state.pop(consumer_id).cond.notify_all()
+            index = self._consumer_index.pop(consumer_id)
+            del self._consumer_by_index[index]
+            self._rebuild_consumer_snapshot()
+            # Clear the bit from in-flight frames before it can be reused. A
+            # frame only waiting on this consumer is now fully acknowledged.
+            bit = 1 << index
+            keep = ~bit
+            completed = []
+            for frame_id, mask in self.delivered_frames.items():
+                if not mask & bit:
+                    continue
+                mask &= keep
+                self.delivered_frames[frame_id] = mask
+                acked = self.acknowledgments.get(frame_id)
+                if acked is not None:
+                    acked &= keep
+                    self.acknowledgments[frame_id] = acked
+                    if acked == mask:
+                        completed.append(frame_id)
+            for frame_id in completed:
+                self._complete_ack_locked(frame_id)
+            heapq.heappush(self._free_consumer_indices, index)
             self.consumer_filters.pop(consumer_id, None)
             self.consumer_status.pop(consumer_id, None)
             self.consumer_maxsize.pop(consumer_id, None)
             self.consumer_overflow_policy.pop(consumer_id, None)
             self.consumer_rate_limits.pop(consumer_id, None)
-            self.consumer_last_receive.pop(consumer_id, None)
             self.consumer_metrics.pop(consumer_id, None)
             self.consumer_failures.pop(consumer_id, None)
             logger.info(f"Consumer '{consumer_id}' unregistered.")
@@ -1146,12 +1879,15 @@ class FramePipeline(Generic[T]):
                     hook(consumer_id)
                 except Exception as e:
                     logger.error(f"Error in on_consumer_unregister hook: {e}")
+        if self._acked_pending:
+            self._run_acknowledged_callbacks()
 
     def pause_consumer(self, consumer_id: str) -> None:
         # with self.lock:
         if consumer_id not in self.consumer_status:
             raise ValueError(f"Consumer '{consumer_id}' is not registered.")
         self.consumer_status[consumer_id] = True
+        self._consumer_state[consumer_id].paused = True
         logger.info(f"Consumer '{consumer_id}' paused.")
         for hook in self.on_consumer_pause:
             try:
@@ -1164,7 +1900,9 @@ class FramePipeline(Generic[T]):
             if consumer_id not in self.consumer_status:
                 raise ValueError(f"Consumer '{consumer_id}' is not registered.")
             self.consumer_status[consumer_id] = False
-            self.condition.notify_all()
+            st = self._consumer_state[consumer_id]
+            st.paused = False
+            st.cond.notify_all()
             logger.info(f"Consumer '{consumer_id}' resumed.")
             for hook in self.on_consumer_resume:
                 try:
@@ -1184,14 +1922,18 @@ class FramePipeline(Generic[T]):
                 raise ValueError(f"Consumer '{consumer_id}' not registered.")
             if max_queue_size is not None:
                 self.consumer_maxsize[consumer_id] = max_queue_size
+                self._consumer_state[consumer_id].maxsize = max_queue_size
             if overflow_policy is not None:
                 if overflow_policy not in ("drop", "error", "block"):
                     raise ValueError(
                         "overflow_policy must be 'drop', 'error', or 'block'"
                     )
                 self.consumer_overflow_policy[consumer_id] = overflow_policy
+                self._consumer_state[consumer_id].overflow_policy = overflow_policy
             if rate_limit is not None:
+                min_interval_ns = self._min_interval_ns(rate_limit)
                 self.consumer_rate_limits[consumer_id] = rate_limit
+                self._consumer_state[consumer_id].min_interval_ns = min_interval_ns
 
     def get_consumer_info(self) -> Dict[str, Dict[str, Any]]:
         with self.lock:
@@ -1224,7 +1966,7 @@ class FramePipeline(Generic[T]):
 
     def health_check(self) -> Dict[str, Any]:
         with self.lock:
-            queue_size = self.queue.qsize()
+            queue_size = self._ring.size()
             consumer_count = len(self.consumers)
             dead_letter_count = len(self.dead_letter_queue)
             consumer_info = self.consumer_info.copy()
@@ -1242,8 +1984,10 @@ class FramePipeline(Generic[T]):
     def replay_frames(self) -> List[Dict[str, Any]]:
         if self.persist_file:
             try:
-                with self.persistence_lock, open(self.persist_file, "r") as f:
-                    return [json.loads(line) for line in f if line.strip()]
+                with self.persistence_lock:
+                    self._flush_persist_buffer()
+                    with open(self.persist_file, "r") as f:
+                        return [json.loads(line) for line in f if line.strip()]
             except Exception as e:
                 logger.error(f"Replay error: {e}")
                 return []
@@ -1251,32 +1995,36 @@ class FramePipeline(Generic[T]):
 
     def clear(self) -> None:
         with self.condition:
-            with self.queue.mutex:
-                self.queue.queue.clear()
-            for cid in self.consumers:
-                self.consumers[cid].clear()
+            self._ring.clear()
+            for st in self._consumer_state.values():
+                st.queue.clear()
+                st.expiry.clear()
             logger.info("Pipeline cleared.")
 
     def qsize(self) -> int:
         with self.lock:
-            return self.queue.qsize()
+            return self._ring.size()
 
     def get_consumer_queue_size(self, consumer_id: str) -> int:
-        with self.lock:
-            return len(self.consumers.get(consumer_id, []))
+        # A single dict probe and len() are atomic; no need for the lock.
+        q = self.consumers.get(consumer_id)
+        return len(q) if q is not None else 0
 
     def close(self) -> None:
         with self.condition:
             self.closed = True
             self.condition.notify_all()
+            for st in self._consumer_state.values():
+                st.cond.notify_all()
+        self._closed_event.set()
+        self._listener_wake.set()
         self.clear()
         logger.info("Pipeline closed.")
-        if self._auto_purge_thread:
-            self._auto_purge_thread.join(timeout=0.1)
-        if self._ack_monitor_thread:
-            self._ack_monitor_thread.join(timeout=0.1)
+        self._scheduler.stop(timeout=0.1)
         if self.persist_file_handle:
-            self.persist_file_handle.close()
+            with self.persistence_lock:
+                self._flush_persist_buffer()
+                self.persist_file_handle.close()
 
     def is_closed(self) -> bool:
         with self.lock:
@@ -1535,6 +2283,205 @@ def test_pre_send_and_pre_delivery_hooks():
     pipeline.close()
 
 
+def test_dequeue_enqueue():
+    pipeline = FramePipeline[int]()
+    pipeline.register_consumer("consumer1")
+    assert pipeline.dequeue_enqueue("consumer1", Frame(data=1, id=100)) is None
+    head = pipeline.dequeue_enqueue("consumer1", Frame(data=2, id=101))
+    assert head is not None and head.data == 1
+    frame = pipeline.receive("consumer1", block=False)
+    assert frame is not None and frame.data == 2
+    with pytest.raises(ValueError):
+        pipeline.dequeue_enqueue("missing", Frame(data=3))
+    pipeline.close()
+
+
+def test_ack_timeouts():
+    pipeline = FramePipeline[int](ack_timeout=0.05)
+    pipeline.register_consumer("fast")
+    pipeline.register_consumer("slow")
+    pipeline.send(1)
+    pipeline.receive("fast", block=False)
+    # The monitor runs every 0.5s; only the consumer that never received the
+    # frame is still unacknowledged once it comes due.
+    time.sleep(1.2)
+    assert pipeline.metrics["frames_retried"] == 1
+    assert pipeline.consumer_failures["slow"] == 1
+    assert pipeline.consumer_failures["fast"] == 0
+    assert not pipeline._delivery_heap
+    pipeline.close()
+
+
+def test_consumer_index_reuse():
+    pipeline = FramePipeline[int]()
+    for cid in ("a", "b", "c"):
+        pipeline.register_consumer(cid)
+    b_index = pipeline._consumer_index["b"]
+    pipeline.unregister_consumer("b")
+    pipeline.register_consumer("d")
+    assert pipeline._consumer_index["d"] == b_index
+    pipeline.register_consumer("e")
+    assert pipeline._consumer_index["e"] == 3
+    assert pipeline._consumer_snapshot[0] == ("a", "c", "d", "e")
+    pipeline.send(1)
+    assert [f.data for f in pipeline.batch_receive("d", 10)] == [1]
+    pipeline.close()
+
+
+def test_batch_receive_rate_limited():
+    pipeline = FramePipeline[int]()
+    pipeline.register_consumer("consumer1", rate_limit=50)
+    for i in range(3):
+        pipeline.send(i)
+    start = time.monotonic()
+    frames = pipeline.batch_receive("consumer1", 10)
+    elapsed = time.monotonic() - start
+    assert [f.data for f in frames] == [0, 1, 2]
+    # Pacing still applies inside the batch: two 20ms gaps after the first.
+    assert elapsed >= 0.035
+    pipeline.close()
+
+
+def test_batch_receive():
+    pipeline = FramePipeline[int]()
+    pipeline.register_consumer("consumer1")
+    pipeline.register_consumer("evens", filter_fn=lambda f: f.data % 2 == 0)
+    for i in range(5):
+        pipeline.send(i)
+    assert [f.data for f in pipeline.batch_receive("consumer1", 3)] == [0, 1, 2]
+    assert [f.data for f in pipeline.batch_receive("consumer1", 10)] == [3, 4]
+    assert pipeline.batch_receive("consumer1", 10) == []
+    assert [f.data for f in pipeline.batch_receive("evens", 10)] == [0, 2, 4]
+    pipeline.close()
+
+
+def test_attach_inline():
+    seen = []
+    pipeline = FramePipeline[int]()
+    pipeline.attach_inline(lambda f: seen.append(f.data))
+    pipeline.send(1)
+    pipeline.send_batch([2, 3])
+    assert seen == [1, 2, 3]
+    pipeline.close()
+
+
+def test_attach_by_key():
+    odd, even, also_even = [], [], []
+    parity = lambda f: f.data % 2
+    pipeline = FramePipeline[int]()
+    pipeline.attach_by_key(parity, 1, lambda f: odd.append(f.data))
+    pipeline.attach_by_key(parity, 0, lambda f: even.append(f.data))
+    pipeline.attach_by_key(parity, 0, lambda f: also_even.append(f.data))
+    for i in range(5):
+        pipeline.send(i)
+    assert odd == [1, 3]
+    assert even == also_even == [0, 2, 4]
+    pipeline.close()
+
+
+def test_send_batch():
+    pipeline = FramePipeline[int]()
+    pipeline.register_consumer("consumer1")
+    pipeline.register_consumer("consumer2")
+    pipeline.send_batch([1, 2, 3], sender_ids=["a", "b", None])
+    frames = pipeline.batch_receive("consumer1", 10)
+    assert [f.data for f in frames] == [1, 2, 3]
+    assert [f.sender_id for f in frames] == ["a", "b", None]
+    assert len(set(f.id for f in frames)) == 3
+    assert [f.data for f in pipeline.batch_receive("consumer2", 10)] == [1, 2, 3]
+    pipeline.close()
+
+
+def test_send_batch_rate_limit_outside_lock():
+    pipeline = FramePipeline[int](global_rate_limit=5)
+    pipeline.register_consumer("consumer1")
+    pipeline.send(0)
+    t = threading.Thread(target=pipeline.send_batch, args=([1, 2, 3],), daemon=True)
+    t.start()
+    time.sleep(0.05)
+    # The batch is waiting out the rate limit, but not under the pipeline lock.
+    start = time.monotonic()
+    frame = pipeline.receive("consumer1", block=False)
+    assert frame is not None and frame.data == 0
+    assert time.monotonic() - start < 0.1
+    t.join()
+    assert [f.data for f in pipeline.batch_receive("consumer1", 10)] == [1, 2, 3]
+    # The batch waited once and booked its other frames' intervals instead.
+    start = time.monotonic()
+    pipeline.send(4)
+    assert time.monotonic() - start >= 0.5
+    pipeline.close()
+
+
+def test_block_overflow_policy():
+    pipeline = FramePipeline[int]()
+    pipeline.register_consumer("consumer1", max_queue_size=1, overflow_policy="block")
+    pipeline.send(1)
+    sent = threading.Event()
+
+    def blocked_send():
+        pipeline.send(2, timeout=5.0)
+        sent.set()
+
+    t = threading.Thread(target=blocked_send, daemon=True)
+    t.start()
+    assert not sent.wait(0.1)
+    frame = pipeline.receive("consumer1", block=False)
+    assert frame is not None and frame.data == 1
+    assert sent.wait(1.0)
+    frame = pipeline.receive("consumer1", block=False)
+    assert frame is not None and frame.data == 2
+    t.join()
+    pipeline.close()
+
+
+def test_block_overflow_policy_times_out():
+    pipeline = FramePipeline[int]()
+    pipeline.register_consumer("consumer1", max_queue_size=1, overflow_policy="block")
+    pipeline.send(1)
+    start = time.monotonic()
+    pipeline.send(2, timeout=0.1)
+    assert 0.09 <= time.monotonic() - start < 1.0
+    frames = pipeline.batch_receive("consumer1", 10)
+    assert [f.data for f in frames] == [1, 2]
+    pipeline.close()
+
+
+def test_ack_mask_cleared_on_unregister():
+    acked = []
+    pipeline = FramePipeline[int]()
+    pipeline.acknowledged_callbacks.append(lambda f: acked.append(f.id))
+    pipeline.register_consumer("a")
+    pipeline.register_consumer("b")
+    pipeline.send(1)
+    frame_id = pipeline.batch_receive("a", 1)[0].id
+    assert frame_id in pipeline.delivered_frames
+    # b's bit goes with it, and must not carry over to the consumer reusing it.
+    pipeline.unregister_consumer("b")
+    pipeline.register_consumer("c")
+    pipeline.acknowledge("c", frame_id)
+    pipeline.acknowledge("a", frame_id)
+    assert frame_id not in pipeline.delivered_frames
+    assert frame_id not in pipeline.acknowledgments
+    assert acked == [frame_id]
+    pipeline.close()
+
+
+def test_unregister_completes_pending_acks():
+    acked = []
+    pipeline = FramePipeline[int]()
+    pipeline.acknowledged_callbacks.append(lambda f: acked.append(f.id))
+    pipeline.register_consumer("a")
+    pipeline.register_consumer("b")
+    pipeline.send(1)
+    frame_id = pipeline.batch_receive("a", 1)[0].id
+    assert acked == []
+    pipeline.unregister_consumer("b")
+    assert acked == [frame_id]
+    assert frame_id not in pipeline.delivered_frames
+    pipeline.close()
+
+
 class FrameListener:
     def __init__(
         self,
@@ -1550,15 +2497,25 @@ class FrameListener:
 
         self.pipeline.register_consumer(self.consumer_id)
 
+    # Upper bound on frames handled per tick, so one busy listener can't starve
+    # the others sharing the pipeline's listeners thread.
+    MAX_FRAMES_PER_TICK = 64
+
     def tick(self):
+        """
+        Handles the frames already queued for this listener without blocking.
+        The pipeline's listeners loop waits for sends, so there is no polling.
+        """
         if self.pipeline.closed:
             logger.error("Pipeline already closed")
             return
-        frame = self.pipeline.receive(self.consumer_id, block=True, timeout=1)
-        if frame is not None and self.on_tick is not None:
-            self.on_tick(frame)
-        else:
-            time.sleep(0.1)
+        frames = self.pipeline.batch_receive(self.consumer_id, self.MAX_FRAMES_PER_TICK)
+        if self.on_tick is not None:
+            for frame in frames:
+                self.on_tick(frame)
+        if len(frames) == self.MAX_FRAMES_PER_TICK:
+            # More may be waiting; come straight back rather than sleeping.
+            self.pipeline._listener_wake.set()
 
 
 def frame_printer(pipeline: FramePipeline[Any]) -> FrameListener:
@@ -1571,6 +2528,32 @@ def frame_printer(pipeline: FramePipeline[Any]) -> FrameListener:
     return FrameListener(pipeline, lambda frame: print("Frame Listener:", frame))
 
 
+class _SupplierBatch:
+    """
+    The PipelineSuppliers sharing one event and one state pipeline. Each
+    UPDATE_STATE event is answered with a single send_batch() of every
+    supplier's state instead of one send() per supplier.
+    """
+
+    def __init__(self, state_pipeline: FramePipeline[StateData]) -> None:
+        self.state_pipeline = state_pipeline
+        self.suppliers: List["PipelineSupplier[Any]"] = []
+
+    def supply(self, frame: Frame[Event]) -> None:
+        if frame.data.event_type == EventType.UPDATE_STATE:
+            suppliers = self.suppliers
+            self.state_pipeline.send_batch(
+                [StateData(id=s.id, state=s.state) for s in suppliers],
+                sender_ids=[s.id for s in suppliers],
+            )
+
+
+# event pipeline -> {state pipeline: _SupplierBatch}. Weak, so a dropped event
+# pipeline doesn't keep its batches alive.
+_supplier_batches: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_supplier_batches_lock = threading.Lock()
+
+
 class PipelineSupplier(Generic[T]):
     def __init__(
         self,
@@ -1584,13 +2567,13 @@ class PipelineSupplier(Generic[T]):
 
         self.id = uuid.uuid4().__str__()
 
-        event_pipeline.attach(FrameListener, self.supply)
-
-    def supply(self, frame: Frame[Event]) -> None:
-        if frame.data.event_type == EventType.UPDATE_STATE:
-            self.state_pipeline.send(
-                StateData(id=self.id, state=self.state), sender_id=self.id
-            )
+        with _supplier_batches_lock:
+            batches = _supplier_batches.setdefault(event_pipeline, {})
+            batch = batches.get(state_pipeline)
+            if batch is None:
+                batch = batches[state_pipeline] = _SupplierBatch(state_pipeline)
+                event_pipeline.attach_inline(batch.supply)
+            batch.suppliers.append(self)
 
     def update(self, new: Optional[T]) -> None:
         self.state = new
@@ -1599,6 +2582,10 @@ class PipelineSupplier(Generic[T]):
         return self.id
 
 
+def _state_data_id(frame: Frame[StateData]) -> str:
+    return frame.data.id
+
+
 class PipelineState(Generic[T]):
     def __init__(self, id: str, state_pipeline: FramePipeline[StateData]) -> None:
         self.id = id
@@ -1606,7 +2593,7 @@ class PipelineState(Generic[T]):
 
         self.current: Optional[T] = None
 
-        self.state_pipeline.attach(FrameListener, self.update)
+        self.state_pipeline.attach_by_key(_state_data_id, self.id, self.update)
 
     @classmethod
     def from_supplier(cls, supplier: PipelineSupplier) -> Self:
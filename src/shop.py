@@ -4,12 +4,12 @@ from typing import List
 from card import GOBLIN_DRILL, TIME_WIZARD, Card
 
 
-@dataclass
+@dataclass(slots=True)
 class ShopCard:
     card: Card
     price: int
 
-@dataclass
+@dataclass(slots=True)
 class Shop:
     cards: List[ShopCard]
 
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from enum import Enum
+from itertools import count
 from socket import socket
 from typing import List, Optional, Self, Tuple
 from uuid import uuid4
@@ -10,7 +11,7 @@ from deck import Deck
 from datetime import datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class Player:
     uuid: str
     sock: socket
@@ -21,7 +22,7 @@ class Player:
     elixir: int
 
 
-@dataclass
+@dataclass(slots=True)
 class NetworkPlayer:
     uuid: str
     hand: List[Card]
@@ -49,14 +50,14 @@ class UnitTargetType(Enum):
     BUILDING = 3
 
 
-@dataclass
+@dataclass(slots=True)
 class UnitTarget:
     uuid: str
     unit_type: UnitTargetType
     path: List[Tuple[int, int]]
 
 
-@dataclass
+@dataclass(slots=True)
 class UnitData:
     x: int
     y: int
@@ -66,24 +67,31 @@ class UnitData:
     last_attack: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Unit:
     underlying: Card
     owner: Owner
     unit_data: UnitData
 
 
-@dataclass
+# Unit ids only need to be unique among live units, so they are a per-process
+# random prefix plus a counter rather than a fresh uuid4 per spawn. next() on a
+# count is atomic, so no lock is needed.
+_UNIT_ID_PREFIX = uuid4().hex
+_unit_ids = count()
+
+
+@dataclass(slots=True)
 class IDUnit:
     inner: Unit
     id: str
 
     @classmethod
     def from_unit(cls, unit: Unit) -> Self:
-        return cls(unit, str(uuid4()))
+        return cls(unit, f"{_UNIT_ID_PREFIX}-{next(_unit_ids)}")
 
 
-@dataclass
+@dataclass(slots=True)
 class UnitDeployRequest:
     pos: Tuple[int, int]
     card: Card
@@ -91,7 +99,7 @@ class UnitDeployRequest:
     battle_id: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Battle:
     p1: Player
     p2: Player
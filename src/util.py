@@ -1,20 +1,25 @@
 from datetime import datetime
 import logging
 import json
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, make_dataclass
+from functools import lru_cache
 from threading import Lock
 import threading
-from typing import Callable, Optional, List, Dict, Any, Tuple, Union
+from typing import Optional, List, Any, Tuple
 
 from chest import ChestRarity
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logging.basicConfig(
     level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
 from typing import Generic, TypeVar
-import math
 
 DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
@@ -25,11 +30,17 @@ U = TypeVar("U")
 class Pair(Generic[T, U]):
     """
     A simple class to represent a pair of values of potentially different types.
+
+    The hash is computed once and cached, so a pair must not be mutated after
+    it has been used as a dict or set key.
     """
 
+    __slots__ = ("first", "second", "_hash")
+
     def __init__(self, first: T, second: U):
         self.first = first
         self.second = second
+        self._hash: Optional[int] = None
 
     def __repr__(self) -> str:
         return f"Pair<{self.first!r}, {self.second!r}>"  # Use !r for repr
@@ -40,14 +51,18 @@ class Pair(Generic[T, U]):
         return self.first == other.first and self.second == other.second
 
     def __hash__(self) -> int:
-        return hash((self.first, self.second))  # Make it hashable
+        h = self._hash
+        if h is None:
+            h = self._hash = hash((self.first, self.second))  # Make it hashable
+        return h
 
     def to_tuple(self) -> tuple[T, U]:
         return (self.first, self.second)
 
     @classmethod
     def from_tuple(cls, tup: tuple[T, U]) -> "Pair[T, U]":
-        if not isinstance(tup, tuple) or len(tup) != 2:
+        # Exact tuples skip the isinstance() MRO walk; subclasses still pass.
+        if (type(tup) is not tuple and not isinstance(tup, tuple)) or len(tup) != 2:
             raise TypeError("Input must be a tuple of length 2")
         return cls(tup[0], tup[1])
 
@@ -73,73 +88,103 @@ def is_point_inside_circle(
         True if the point is inside or on the circle, False otherwise.
     """
 
-    distance = math.sqrt((point_x - center_x) ** 2 + (point_y - center_y) ** 2)
+    dx = point_x - center_x
+    dy = point_y - center_y
+
+    # Comparing squared distances gives the same answer without a square root.
+    return dx * dx + dy * dy <= radius * radius
+
+
+# Distinct payload shapes kept by json_to_dataclass's class cache.
+SCHEMA_CACHE_SIZE = 128
+_JSON_PRIMITIVES = frozenset((int, float, str, bool))
 
-    return distance <= radius
+
+def _schema_signature(data: Any) -> Any:
+    """
+    Builds a hashable description of the shape json_to_dataclass derives types
+    from: a tuple of (key, signature) pairs for a dict, (list,) or
+    (list, element signature) for a list, and the type itself otherwise.
+    """
+    kind = type(data)
+    if kind is dict:
+        return tuple((key, _schema_signature(value)) for key, value in data.items())
+    if kind is list:
+        return (list, _schema_signature(data[0])) if data else (list,)
+    return kind
 
 
 def json_to_dataclass(data: bytes, root_dataclass_name: str = "GameState") -> Any:
     """
     Converts a JSON byte string into a nested dataclass structure.
+
+    Generated classes are cached by the payload's schema, so repeated payloads
+    of the same shape reuse them instead of rebuilding the hierarchy.
+    """
+    json_data = orjson.loads(data) if orjson is not None else json.loads(data)
+    root_dataclass = _dataclass_for_schema(
+        root_dataclass_name, _schema_signature(json_data)
+    )
+    return root_dataclass(**json_data)
+
+
+@lru_cache(maxsize=SCHEMA_CACHE_SIZE)
+def _dataclass_for_schema(root_dataclass_name: str, signature: Any) -> type:
+    """
+    Builds the dataclass hierarchy for one payload shape from its schema
+    signature. Least recently used shapes are evicted, so payloads whose keys
+    keep changing can't grow the cache without bound.
     """
-    json_data = json.loads(data.decode())
     dataclass_definitions = {}
 
-    def _create_dataclass(name: str, data: Union[Dict[str, Any], List[Any]]) -> type:
+    def _create_dataclass(name: str, sig: Any) -> type:
         """
-        Recursively creates dataclass definitions from a JSON dictionary or list of dictionaries.
+        Recursively creates dataclass definitions from a dict or list signature.
         """
         if name in dataclass_definitions:
             return dataclass_definitions[name]
 
-        if (
-            isinstance(data, list) and data and isinstance(data[0], dict)
-        ):  # list of dictionaries
-            sub_dataclass_name = "".join(
-                word.capitalize() for word in name.split("_singular")
-            )
-            if not sub_dataclass_name:
+        is_tuple = type(sig) is tuple
+        if is_tuple and sig and sig[0] is list:
+            element = sig[1] if len(sig) == 2 else None
+            if type(element) is tuple and not (element and element[0] is list):
+                # List of dictionaries.
                 sub_dataclass_name = "".join(
-                    word.capitalize() for word in name.split("_")
+                    word.capitalize() for word in name.split("_singular")
                 )
-            sub_dataclass = _create_dataclass(sub_dataclass_name, data[0])
-            return List[sub_dataclass]
-
-        if isinstance(data, list):
-            if data and isinstance(data[0], (int, float, str, bool)):
-                return List[type(data[0])]
-            else:
-                return List[Any]
-
-        if not isinstance(data, dict):  # primitive types
-            return type(data)
+                if not sub_dataclass_name:
+                    sub_dataclass_name = "".join(
+                        word.capitalize() for word in name.split("_")
+                    )
+                sub_dataclass = _create_dataclass(sub_dataclass_name, element)
+                return List[sub_dataclass]
+            if element in _JSON_PRIMITIVES:
+                return List[element]
+            return List[Any]
+
+        if not is_tuple:  # primitive types
+            return sig
 
         fields = []
-        annotations = {}
 
-        for key, value in data.items():
-            field_type = type(value)
-
-            if isinstance(value, dict) or isinstance(value, list):
+        for key, value_sig in sig:
+            if type(value_sig) is tuple:  # dict or list
                 sub_dataclass_name = "".join(
                     word.capitalize() for word in key.split("_")
                 )
-                field_type = _create_dataclass(sub_dataclass_name, value)
+                field_type = _create_dataclass(sub_dataclass_name, value_sig)
+            elif key == "rarity":
+                field_type = ChestRarity
             else:
-                if key == "rarity":
-                    field_type = ChestRarity
-                else:
-                    field_type = type(value)
+                field_type = value_sig
 
-            fields.append((key, field(default=None)))
-            annotations[key] = Optional[field_type]
+            fields.append((key, Optional[field_type], field(default=None)))
 
-        new_dataclass = dataclass(type(name, (), {"__annotations__": annotations}))
+        new_dataclass = make_dataclass(name, fields, frozen=True, slots=True)
         dataclass_definitions[name] = new_dataclass
         return new_dataclass
 
-    root_dataclass = _create_dataclass(root_dataclass_name, json_data)
-    return root_dataclass(**json_data)
+    return _create_dataclass(root_dataclass_name, signature)
 
 
 T = TypeVar("T")
@@ -163,9 +208,12 @@ class Mutex(Generic[T]):
         self._lock.release()
 
     def get_data(self) -> Optional[T]:
-        """Gets the data immutably (read-only)."""
-        with self._lock:
-            return self._data
+        """Gets the data immutably (read-only).
+
+        Reading a single attribute is atomic, so this does not take the lock;
+        writers still serialise through set_data or the context manager.
+        """
+        return self._data
 
     def get_mutable_data(self) -> Optional[Tuple[threading.Lock, Optional[T]]]:
         """Gets the data mutably (with lock). Returns the lock and data, or None if lock fails."""